@@ -0,0 +1,78 @@
+"""
+Micro-benchmarks: heapq-based PriorityQueue vs. the original pure-Python heap.
+
+    python benchmarks/bench_priority_queue.py --n 100000 --k 10
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from priority_queue import PriorityQueue
+from legacy_priority_queue import PriorityQueue as LegacyPriorityQueue
+
+
+def legacy_build(pairs):
+    pq = LegacyPriorityQueue()
+    for prio, item in pairs:
+        pq.insert(prio, item)
+    return pq
+
+
+def legacy_top_k(pq, k):
+    # what ReviewManager.get_top_reviews used to do: clone, then extract k
+    clone = legacy_build(pq.heap)
+    return [clone.extract_max()[1] for _ in range(min(k, clone.size))]
+
+
+def legacy_drain(pq):
+    while not pq.is_empty():
+        pq.extract_max()
+
+
+def insert_all(pairs):
+    pq = PriorityQueue()
+    for prio, item in pairs:
+        pq.insert(prio, item)
+    return pq
+
+
+def drain(pq):
+    while not pq.is_empty():
+        pq.extract_max()
+
+
+def run(n, k, repeat, seed=0):
+    rng = random.Random(seed)
+    pairs = [(rng.uniform(1, 5), {"id": i, "timestamp": i}) for i in range(n)]
+    legacy = legacy_build(pairs)
+    current = PriorityQueue.from_items(pairs)
+
+    cases = [
+        ("insert one by one", lambda: legacy_build(pairs),
+                              lambda: insert_all(pairs)),
+        ("bulk build",        lambda: legacy_build(pairs),
+                              lambda: PriorityQueue.from_items(pairs)),
+        (f"top-{k} (non-destructive)", lambda: legacy_top_k(legacy, k),
+                              lambda: current.nlargest(k)),
+        ("drain all",         lambda: legacy_drain(legacy_build(pairs)),
+                              lambda: drain(PriorityQueue.from_items(pairs))),
+    ]
+    print(f"n={n} k={k} best of {repeat} (seconds)")
+    print(f"{'case':<28}{'legacy':>12}{'heapq':>12}{'speedup':>10}")
+    for name, old, new in cases:
+        t_old = min(timeit.repeat(old, number=1, repeat=repeat))
+        t_new = min(timeit.repeat(new, number=1, repeat=repeat))
+        print(f"{name:<28}{t_old:>12.5f}{t_new:>12.5f}{t_old / t_new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.n, args.k, args.repeat)
@@ -0,0 +1,263 @@
+"""
+Benchmark suite: data-structure micro-benchmarks and endpoint load tests.
+
+    python benchmarks/run_benchmarks.py --data-dir /tmp/bench --output run.json
+    python benchmarks/run_benchmarks.py --data-dir /tmp/bench --skip-generate \
+        --output new.json --compare run.json
+
+Generates a synthetic corpus (see synthetic.py), then times the Trie,
+PriorityQueue and ReviewManager directly and the Flask routes through the
+test client. Every result reports p50/p99/mean latency, throughput and
+peak memory; the JSON output can be compared across runs with --compare.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+import synthetic
+
+def max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def summarize(name, kind, latencies, wall, peak_mb=None):
+    ordered = sorted(latencies)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "name": name,
+        "kind": kind,
+        "n": len(ordered),
+        "p50_ms": round(pick(0.50) * 1000, 4),
+        "p99_ms": round(pick(0.99) * 1000, 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "throughput_per_s": round(len(ordered) / wall, 1) if wall else None,
+        "peak_mem_mb": round(peak_mb, 2) if peak_mb is not None else None,
+        "max_rss_mb": round(max_rss_mb(), 1),
+    }
+
+def timed_calls(fn, args_list):
+    """Call fn(*args) for each args tuple; return (latencies, wall seconds)."""
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for args in args_list:
+        t = clock()
+        fn(*args)
+        latencies.append(clock() - t)
+    return latencies, clock() - start
+
+def traced_build(build):
+    """Run build() under tracemalloc; return (result, seconds, peak MB)."""
+    gc.collect()
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - t
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024)
+
+# ─── micro-benchmarks ────────────────────────────────────────────────────
+def bench_trie(corpus, rng, n):
+    from trie import Trie
+    from text_tokens import ingredient_tokens
+    import sqlite3
+
+    conn = sqlite3.connect(corpus["db_path"])
+    tokens = [tok for (text,) in conn.execute("SELECT ingredients FROM recipies")
+              for tok in ingredient_tokens(text)]
+    conn.close()
+
+    def build():
+        trie = Trie()
+        for tok in tokens:
+            trie.insert(tok)
+        return trie
+
+    trie, secs, peak = traced_build(build)
+    results = [summarize("trie.build", "micro", [secs], secs, peak)]
+    vocab = corpus["vocab"]
+    prefixes = [(rng.choice(vocab)[:rng.randint(1, 4)],) for _ in range(n)]
+    lat, wall = timed_calls(lambda p: trie.autocomplete(p, limit=10), prefixes)
+    results.append(summarize("trie.autocomplete(limit=10)", "micro", lat, wall))
+    return results
+
+def bench_priority_queue(rng, n):
+    from priority_queue import PriorityQueue
+
+    pairs = [(rng.uniform(1, 5), i) for i in range(n)]
+    pq, secs, peak = traced_build(lambda: PriorityQueue.from_items(pairs))
+    results = [summarize("priority_queue.from_items", "micro", [secs], secs, peak)]
+    lat, wall = timed_calls(pq.nlargest, [(10,)] * 1000)
+    results.append(summarize("priority_queue.nlargest(10)", "micro", lat, wall))
+    lat, wall = timed_calls(pq.insert, [(p, i) for p, i in pairs[:10000]])
+    results.append(summarize("priority_queue.insert", "micro", lat, wall))
+    lat, wall = timed_calls(pq.extract_max, [()] * 10000)
+    results.append(summarize("priority_queue.extract_max", "micro", lat, wall))
+    return results
+
+def bench_reviews(corpus, rng, n):
+    from review import ReviewManager
+
+    manager, secs, peak = traced_build(
+        lambda: ReviewManager(corpus["reviews_path"], db_path=corpus["db_path"])
+    )
+    results = [summarize("review_manager.load", "micro", [secs], secs, peak)]
+    names = corpus["names"]
+    picks = [(rng.choice(names),) for _ in range(n)]
+    for label, fn in (("get_average_rating", manager.get_average_rating),
+                      ("get_top_reviews", manager.get_top_reviews)):
+        lat, wall = timed_calls(fn, picks)
+        results.append(summarize(f"review_manager.{label}", "micro", lat, wall))
+    lat, wall = timed_calls(manager.get_top_rated_recipes, [(10,)] * n)
+    results.append(summarize("review_manager.get_top_rated_recipes(10)", "micro", lat, wall))
+    lat, wall = timed_calls(
+        manager.add_review,
+        [(rng.choice(names), "bench", float(rng.randint(1, 5)), "") for _ in range(min(n, 500))]
+    )
+    results.append(summarize("review_manager.add_review", "micro", lat, wall))
+    manager.conn.close()
+    return results
+
+# ─── endpoint load tests ─────────────────────────────────────────────────
+def bench_endpoints(corpus, rng, n):
+    os.environ["RECIPES_DB"] = corpus["db_path"]
+    os.environ["REVIEWS_FILE"] = corpus["reviews_path"]
+    os.environ["INDEX_SNAPSHOT"] = os.path.join(os.path.dirname(corpus["db_path"]),
+                                                "index_snapshot.bin")
+    t = time.perf_counter()
+    import main
+    startup = time.perf_counter() - t
+    results = [summarize("app.startup", "endpoint", [startup], startup)]
+    client = main.app.test_client()
+    names, vocab = corpus["names"], corpus["vocab"]
+
+    def word():
+        return rng.choice(vocab)
+
+    cases = [
+        ("GET /get-greatlakes?name=", lambda: client.get(
+            "/get-greatlakes", query_string={"name": word()})),
+        ("GET /get-greatlakes?ingredient=", lambda: client.get(
+            "/get-greatlakes", query_string={"ingredient": word(), "limit": 50})),
+        ("GET /get-greatlakes?limit=100", lambda: client.get(
+            "/get-greatlakes", query_string={"limit": 100,
+                                             "after": rng.randint(0, len(names))})),
+        ("GET /suggest-recipes", lambda: client.get(
+            "/suggest-recipes", query_string={"q": word()[:rng.randint(1, 5)]})),
+        ("GET /suggest-ingredients", lambda: client.get(
+            "/suggest-ingredients", query_string={"q": word()[:rng.randint(1, 3)]})),
+        ("GET /trending", lambda: client.get(
+            "/trending", query_string={"limit": 10,
+                                       "window": rng.choice(["hour", "day", "week", "all"])})),
+        ("POST /record-view", lambda: client.post(
+            "/record-view", json={"name": rng.choice(names)})),
+        ("POST /add-review", lambda: client.post(
+            "/add-review", json={"recipe_name": rng.choice(names), "username": "bench",
+                                 "rating": rng.randint(1, 5), "comment": "load test"})),
+    ]
+    for label, call in cases:
+        count = n if "greatlakes" not in label else max(1, n // 10)
+        statuses = {}
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(count):
+            t = time.perf_counter()
+            resp = call()
+            latencies.append(time.perf_counter() - t)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+        row = summarize(label, "endpoint", latencies, time.perf_counter() - start)
+        row["statuses"] = statuses
+        results.append(row)
+    return results
+
+# ─── reporting ───────────────────────────────────────────────────────────
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True
+        ).strip()
+    except Exception:
+        return None
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"\n{'benchmark':<42}{'p50 old':>10}{'p50 new':>10}{'p99 old':>10}{'p99 new':>10}")
+    for row in current:
+        old = baseline.get(row["name"])
+        if old:
+            print(f"{row['name']:<42}{old['p50_ms']:>10.3f}{row['p50_ms']:>10.3f}"
+                  f"{old['p99_ms']:>10.3f}{row['p99_ms']:>10.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--views", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="calls per micro-benchmark / endpoint")
+    parser.add_argument("--skip-generate", action="store_true",
+                        help="reuse the corpus already in --data-dir")
+    parser.add_argument("--only", choices=["micro", "endpoint"])
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    args = parser.parse_args()
+
+    if args.skip_generate:
+        import sqlite3
+        db_path = os.path.join(args.data_dir, "recipes.db")
+        conn = sqlite3.connect(db_path)
+        names = [r[0] for r in conn.execute("SELECT name FROM recipies ORDER BY id")]
+        conn.close()
+        corpus = {"db_path": db_path, "names": names,
+                  "reviews_path": os.path.join(args.data_dir, "reviews.json"),
+                  "vocab": synthetic.vocabulary(random.Random(args.seed))}
+    else:
+        corpus = synthetic.generate(args.data_dir, args.recipes, args.reviews,
+                                    args.views, args.seed)
+
+    rng = random.Random(args.seed)
+    results = []
+    if args.only in (None, "micro"):
+        results += bench_trie(corpus, rng, args.requests)
+        results += bench_priority_queue(rng, max(args.requests, 100_000))
+        results += bench_reviews(corpus, rng, args.requests)
+    if args.only in (None, "endpoint"):
+        results += bench_endpoints(corpus, rng, args.requests)
+
+    report = {
+        "meta": {
+            "recipes": len(corpus["names"]), "reviews": args.reviews,
+            "views": args.views, "seed": args.seed, "requests": args.requests,
+            "python": platform.python_version(), "platform": platform.platform(),
+            "git": git_revision(), "timestamp": time.time(),
+        },
+        "results": results,
+    }
+    for row in results:
+        print(f"{row['name']:<42} p50 {row['p50_ms']:>9.3f} ms  p99 {row['p99_ms']:>9.3f} ms"
+              f"  {row['throughput_per_s'] or 0:>10.1f}/s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Deterministic synthetic corpus for benchmarks.
+
+    python benchmarks/synthetic.py --data-dir /tmp/bench --recipes 100000 \
+        --reviews 1000000 --views 10000000
+
+Writes <data-dir>/recipes.db (migrated schema, recipes, reviews table,
+view counters and hourly view buckets) and an empty <data-dir>/reviews.json.
+The same --seed always produces the same data.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from migrations import apply_migrations
+from recipe_store import insert_recipes
+from review import ReviewManager
+
+BASE_INGREDIENTS = """
+    wild rice corn beans squash pumpkin bison venison elk salmon trout walleye
+    whitefish maple syrup honey blueberries cranberries chokecherries
+    strawberries raspberries sunflower seeds oil hominy cornmeal flour sage
+    sumac juniper berries onion garlic leeks ramps mushrooms potatoes
+    turnips carrots acorn hazelnuts walnuts butter milk eggs salt pepper
+    thyme oregano cumin stock water tomatoes peppers zucchini lard
+""".split()
+
+UNITS = ["1 C.", "2 C.", "1/2 C.", "1 Tbsp", "2 tsp", "1 lb", "3 oz", "Pinch"]
+DISHES = ["Stew", "Soup", "Salad", "Bread", "Cakes", "Bake", "Porridge",
+          "Skillet", "Roast", "Pudding", "Sauce", "Fry", "Chowder", "Jerky"]
+STYLES = ["Smoked", "Wild", "Maple", "Fire-Roasted", "Cedar", "Harvest",
+          "Spring", "Winter", "Three Sisters", "Lakeside", "Hearty", "Sweet"]
+USERS = [f"user{i}" for i in range(5000)]
+
+def vocabulary(rng, size=2000):
+    """Real ingredient words plus pronounceable made-up ones."""
+    syllables = ["ka", "mi", "no", "wa", "ta", "shi", "ro", "ne", "pa", "qu",
+                 "zo", "li", "ba", "to", "ge", "mo", "su", "ri", "da", "ve"]
+    words = list(dict.fromkeys(BASE_INGREDIENTS))
+    while len(words) < size:
+        word = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        if word not in words:
+            words.append(word)
+    return words
+
+def zipf_weights(n, s=1.1):
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+def make_recipes(rng, count, vocab):
+    weights = zipf_weights(len(vocab))
+    for i in range(count):
+        main = rng.choices(vocab, weights, k=1)[0]
+        name = f"{rng.choice(STYLES)} {main.title()} {rng.choice(DISHES)} #{i}"
+        items = rng.choices(vocab, weights, k=rng.randint(5, 12))
+        yield {
+            "name": name,
+            "ingredients": [f"{rng.choice(UNITS)} {item}" for item in items],
+            "instructions": [f"Step {n + 1}: combine {rng.choice(items)} and "
+                             f"{rng.choice(items)}; cook {rng.randint(2, 40)} min."
+                             for n in range(rng.randint(2, 6))],
+        }
+
+def generate(data_dir, recipes=100_000, reviews=1_000_000, views=10_000_000,
+             seed=42, batch=2000, log=print):
+    os.makedirs(data_dir, exist_ok=True)
+    db_path = os.path.join(data_dir, "recipes.db")
+    reviews_path = os.path.join(data_dir, "reviews.json")
+    for path in (db_path, db_path + "-wal", db_path + "-shm", reviews_path):
+        if os.path.exists(path):
+            os.remove(path)
+    with open(reviews_path, "w") as f:
+        json.dump({}, f)
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    apply_migrations(conn, os.path.join(BACKEND_DIR, "schema.sql"))
+
+    t = time.perf_counter()
+    vocab = vocabulary(rng)
+    pending = []
+    for recipe in make_recipes(rng, recipes, vocab):
+        pending.append(recipe)
+        if len(pending) >= batch:
+            insert_recipes(conn, pending)
+            pending = []
+    if pending:
+        insert_recipes(conn, pending)
+    names = [row[0] for row in conn.execute("SELECT name FROM recipies ORDER BY id")]
+    log(f"recipes: {len(names)} in {time.perf_counter() - t:.1f}s")
+
+    # reviews go straight into the table ReviewManager reads
+    t = time.perf_counter()
+    ReviewManager(reviews_path, db_path=db_path).conn.close()
+    popularity = zipf_weights(len(names), s=0.9)
+    now = time.time()
+    written = 0
+    while written < reviews:
+        n = min(50_000, reviews - written)
+        picked = rng.choices(names, popularity, k=n)
+        with conn:
+            conn.executemany(
+                "INSERT INTO reviews(recipe_name, username, rating, comment, timestamp) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(name, rng.choice(USERS), float(rng.randint(1, 5)),
+                  "synthetic review", now - rng.uniform(0, 365 * 86400))
+                 for name in picked]
+            )
+        written += n
+    log(f"reviews: {reviews} in {time.perf_counter() - t:.1f}s")
+
+    # view events are aggregated into counters + hourly buckets (last 7 days)
+    t = time.perf_counter()
+    totals, buckets = {}, {}
+    hour_now = int(now // 3600)
+    remaining = views
+    while remaining > 0:
+        n = min(1_000_000, remaining)
+        for name in rng.choices(names, popularity, k=n // 100):
+            totals[name] = totals.get(name, 0) + 100
+            key = (name, hour_now - rng.randint(0, 7 * 24))
+            buckets[key] = buckets.get(key, 0) + 100
+        remaining -= n
+    with conn:
+        conn.executemany("INSERT INTO recipe_views(name, views) VALUES (?, ?)",
+                         list(totals.items()))
+        conn.executemany(
+            "INSERT INTO recipe_view_buckets(name, hour, views) VALUES (?, ?, ?)",
+            [(name, hour, v) for (name, hour), v in buckets.items()]
+        )
+    log(f"views: {views} events over {len(totals)} recipes in "
+        f"{time.perf_counter() - t:.1f}s")
+    conn.close()
+    return {"db_path": db_path, "reviews_path": reviews_path, "names": names,
+            "vocab": vocab}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", required=True)
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--views", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    generate(args.data_dir, args.recipes, args.reviews, args.views, args.seed)
@@ -0,0 +1,145 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from db import connect
+
+# Cross-process change feed.
+#
+# Every process serving the app keeps its own in-memory indexes and
+# aggregates. Writes that those depend on are appended to 'change_log' in
+# the same transaction as the write itself, tagged with the writing
+# process's origin; each process tails the log and applies what the others
+# wrote. New recipes are logged by a trigger (no origin) and are applied
+# idempotently by name.
+
+_origin = (None, None)
+
+def origin():
+    """Id of this process; regenerated after fork(), so workers differ."""
+    global _origin
+    pid, token = _origin
+    if pid != os.getpid():
+        _origin = pid, token = os.getpid(), f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    return token
+
+def create_change_log(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS change_log(
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            origin     TEXT,
+            kind       TEXT NOT NULL,
+            payload    TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_change_log_created ON change_log(created_at);
+    """)
+
+def log_change(conn, kind, payload):
+    """Append a change from this process (call inside the write's transaction)."""
+    conn.execute(
+        "INSERT INTO change_log(origin, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+        (origin(), kind, json.dumps(payload), time.time())
+    )
+
+class ChangeFeed:
+    """
+    Tails 'change_log' and calls handlers[kind](payload) for changes made
+    by other processes, in log order.
+
+    poll() first compares PRAGMA data_version, which only moves when
+    another connection commits, so an idle poll costs one pragma. The
+    feed starts at the log's current end: create it *before* loading state
+    from the database, so nothing written in between is missed (changes
+    that were already loaded may be seen twice, so handlers must tolerate
+    that). Entries older than `retention` seconds are pruned.
+    """
+
+    def __init__(self, db_path, handlers=None, interval=1.0, retention=7 * 86400):
+        self.db_path = db_path
+        self.handlers = dict(handlers or {})
+        self.interval = interval
+        self.retention = retention
+        self.conn = None
+        self.lock = threading.Lock()
+        self.applied = 0
+        self.last_pruned = 0
+        self._data_version = None
+        self._thread = None
+        self._stop = threading.Event()
+        self.position = self._connection().execute(
+            "SELECT COALESCE(MAX(id), 0) FROM change_log"
+        ).fetchone()[0]
+
+    def _connection(self):
+        if self.conn is None:
+            self.conn = connect(self.db_path)
+        return self.conn
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def poll(self):
+        """Apply pending changes from other processes; returns how many."""
+        with self.lock:
+            conn = self._connection()
+            version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return 0
+            self._data_version = version
+            rows = conn.execute(
+                "SELECT id, origin, kind, payload FROM change_log WHERE id > ? ORDER BY id",
+                (self.position,)
+            ).fetchall()
+            mine, count = origin(), 0
+            for row in rows:
+                self.position = row["id"]
+                if row["origin"] == mine:
+                    continue
+                handler = self.handlers.get(row["kind"])
+                if handler is None:
+                    continue
+                try:
+                    handler(json.loads(row["payload"]))
+                    count += 1
+                except Exception as e:
+                    print(f"Error applying change {row['id']} ({row['kind']}): {e}")
+            self.applied += count
+            return count
+
+    def prune(self):
+        """Drop entries older than the retention window."""
+        with self.lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM change_log WHERE created_at < ?",
+                             (time.time() - self.retention,))
+            self.last_pruned = time.time()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+                if time.time() - self.last_pruned > 3600:
+                    self.prune()
+            except sqlite3.Error as e:
+                print(f"Error polling change log: {e}")
+
+    def start(self):
+        """Start the polling thread (idempotent; call again after fork())."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="change-feed",
+                                            daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stop polling and close the connection (e.g. before fork())."""
+        self._stop.set()
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+                self._data_version = None
@@ -0,0 +1,119 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from metrics import InstrumentedConnection
+
+# Shared SQLite connection management.
+#
+# Connections are opened once with tuned pragmas and then reused: each keeps
+# its own prepared-statement cache (`cached_statements`), so hot queries are
+# compiled once per connection instead of once per request. WAL lets readers
+# proceed while a writer (the scraper, the view flusher) commits.
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous':  'NORMAL',       # durable at checkpoints; safe with WAL
+    'mmap_size':    256 * 1024 * 1024,
+    'cache_size':   -16000,         # KiB (negative) → ~16 MB page cache
+    'temp_store':   'MEMORY',
+}
+
+def connect(db_path, timeout=5.0, cached_statements=256, pragmas=None):
+    """Open a tuned connection; `timeout` is the busy timeout in seconds."""
+    conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False,
+                           cached_statements=cached_statements,
+                           factory=InstrumentedConnection)
+    conn.row_factory = sqlite3.Row
+    for name, value in (PRAGMAS if pragmas is None else pragmas).items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+class ConnectionPool:
+    """
+    LIFO pool of tuned connections for one database file.
+
+    acquire() hands out an idle connection (or opens one) and release()
+    returns it, rolling back anything left uncommitted. At most `max_idle`
+    connections are kept open between uses; extra ones are closed.
+    """
+
+    def __init__(self, db_path, max_idle=8, **connect_args):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self.connect_args = connect_args
+        self.idle = []
+        self.lock = threading.Lock()
+        self.opened = self.closed = 0
+        self.acquired = self.reused = 0
+        self.in_use = 0
+
+    def acquire(self):
+        with self.lock:
+            self.acquired += 1
+            self.in_use += 1
+            if self.idle:
+                self.reused += 1
+                return self.idle.pop()
+            self.opened += 1
+        try:
+            return connect(self.db_path, **self.connect_args)
+        except sqlite3.Error:
+            with self.lock:
+                self.in_use -= 1
+                self.opened -= 1
+            raise
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            conn = None
+        with self.lock:
+            self.in_use -= 1
+            if conn is not None and len(self.idle) < self.max_idle:
+                self.idle.append(conn)
+                return
+            self.closed += 1
+        if conn is not None:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as conn: ... (released afterwards)."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'opened': self.opened,
+                'closed': self.closed,
+                'acquired': self.acquired,
+                'reused': self.reused,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+            }
+
+    def close(self):
+        """Close every idle connection."""
+        with self.lock:
+            idle, self.idle = self.idle, []
+            self.closed += len(idle)
+        for conn in idle:
+            conn.close()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path, **kwargs):
+    """The process-wide pool for `db_path` (created on first use)."""
+    with _pools_lock:
+        pool = _pools.get(db_path)
+        if pool is None:
+            pool = _pools[db_path] = ConnectionPool(db_path, **kwargs)
+        return pool
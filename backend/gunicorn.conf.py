@@ -0,0 +1,22 @@
+# Multi-process serving:  cd backend && gunicorn -c gunicorn.conf.py main:app
+#
+# The app is imported once in the master (preload_app) and forked, so the
+# tries and other read-only indexes are shared copy-on-write. Each worker
+# follows the others' writes through the change_log feed (see changes.py).
+import multiprocessing
+import os
+
+os.environ.setdefault("MULTIPROCESS", "1")
+
+bind = os.environ.get("BIND", "127.0.0.1:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True
+
+def pre_fork(server, worker):
+    import main
+    main.before_fork()
+
+def post_fork(server, worker):
+    import main
+    main.after_fork()
@@ -0,0 +1,40 @@
+from trie import Trie
+from name_index import RecipeNameIndex
+from pantry import PantryIndex
+from similarity import SimilarityIndex
+from text_tokens import ingredient_tokens
+from snapshot import IndexSnapshot
+from migrations import recipes_generation
+
+# The recipe-derived in-memory indexes, shared by the web app (main.py) and
+# the bulk ingestion command (ingest.py), which rebuilds the snapshot once
+# after a load so no web process has to.
+
+def build_indexes(db):
+    """Build every recipe-derived index from scratch."""
+    indexes = {
+        "recipe_trie":     Trie(),
+        "ingredient_trie": Trie(),
+        "recipe_index":    RecipeNameIndex(),
+        "pantry_index":    PantryIndex(),
+        "similar_index":   SimilarityIndex(),
+    }
+    for row in db.execute("SELECT name, ingredients FROM recipies"):
+        indexes["recipe_trie"].insert(row["name"])
+        indexes["recipe_index"].add(row["name"])
+        for token in ingredient_tokens(row["ingredients"]):
+            indexes["ingredient_trie"].insert(token)
+        indexes["pantry_index"].add(row["name"], row["ingredients"])
+        indexes["similar_index"].add(row["name"], row["ingredients"])
+    indexes["similar_index"].build()
+    return indexes
+
+def load_indexes(db, snapshot_path):
+    """Load indexes from the snapshot, rebuilding it if recipes changed."""
+    snapshot = IndexSnapshot(snapshot_path)
+    key      = recipes_generation(db)
+    indexes  = snapshot.load(key)
+    if indexes is None:
+        indexes = build_indexes(db)
+        snapshot.save(key, indexes)
+    return indexes
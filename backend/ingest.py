@@ -0,0 +1,304 @@
+"""
+Bulk-load recipes from JSON / JSONL catalogs into the recipes database.
+
+    python ingest.py recipes.json
+    python ingest.py catalog.jsonl more.jsonl --db /srv/recipes.db --batch-size 2000
+
+Accepted layouts: a JSON list of recipes, a JSON object of
+{"Region": [recipes, ...]} (like recipes.json), or JSONL with one recipe per
+line. A recipe is an object with "name", "ingredients" and "instructions"
+(or "directions"/"steps", any case), each a list of lines or a
+newline-separated string; other fields are ignored.
+
+Files are parsed incrementally, so memory does not grow with file size
+(only the dedupe set does, by one short digest per recipe). Invalid
+records are reported and skipped. Recipes whose name or content (the
+normalized ingredient and instruction lines) is already in the database,
+or earlier in the input, are skipped as duplicates. Rows are written
+--batch-size at a time, one transaction per batch. The in-memory search
+indexes are rebuilt once at the end and saved as the index snapshot, and
+running app processes are told to reload it with a single 'reindex' change.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import resource
+import sys
+import time
+
+from db import connect
+from migrations import apply_migrations
+from recipe_store import insert_recipes
+from indexes import load_indexes
+from changes import log_change
+from search_index import RecipeSearchIndex
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MAX_NAME_LENGTH = 200
+# accepted keys per field, compared case-insensitively
+FIELDS = {
+    'name': ('name', 'title'),
+    'ingredients': ('ingredients',),
+    'instructions': ('instructions', 'directions', 'steps'),
+}
+
+class JSONStream:
+    """
+    Incremental reader over a JSON text file: walks the enclosing
+    arrays/objects token by token and decodes one element at a time with
+    json.JSONDecoder.raw_decode, refilling a `chunk_size` buffer as needed.
+    """
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"expected {char!r}, found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue        # value runs past the buffer
+                raise
+            if end == len(self.buf) and self._fill():
+                continue            # a number may be cut off at the buffer end
+            self.pos = end
+            return obj
+
+    def array(self):
+        """Yield the elements of the array starting here."""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ']':
+                self.pos += 1
+                return
+            self.expect(',')
+
+def iter_json(f):
+    """(location, record) for a JSON list or {region: [records]} file."""
+    stream = JSONStream(f)
+    if stream.peek() == '[':
+        for i, record in enumerate(stream.array()):
+            yield f"[{i}]", record
+    else:
+        stream.expect('{')
+        if stream.peek() == '}':
+            stream.pos += 1
+            return
+        while True:
+            region = stream.value()
+            stream.expect(':')
+            for i, record in enumerate(stream.array()):
+                yield f"{region}[{i}]", record
+            if stream.peek() == '}':
+                stream.pos += 1
+                break
+            stream.expect(',')
+    if stream.peek():
+        raise ValueError("unexpected data after the top-level value")
+
+def iter_jsonl(f):
+    """(location, record) per non-blank line; undecodable lines yield the error."""
+    for lineno, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield f"line {lineno}", json.loads(line)
+        except ValueError as e:
+            yield f"line {lineno}", e
+
+def _lines(value, field):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"'{field}' must be a list of strings or a string")
+    lines = [line.strip() for v in value for line in v.split('\n')]
+    lines = [line for line in lines if line]
+    if not lines:
+        raise ValueError(f"'{field}' is empty")
+    return lines
+
+def validate(record):
+    """Normalized {'name', 'ingredients', 'instructions'}; raises ValueError."""
+    if isinstance(record, Exception):
+        raise ValueError(f"invalid JSON: {record}")
+    if not isinstance(record, dict):
+        raise ValueError("not an object")
+    keys = {str(key).lower(): value for key, value in record.items()}
+    fields = {
+        field: next((keys[alias] for alias in aliases if alias in keys), None)
+        for field, aliases in FIELDS.items()
+    }
+    name = fields['name']
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("missing 'name'")
+    name = ' '.join(name.split())
+    if len(name) > MAX_NAME_LENGTH:
+        raise ValueError(f"'name' longer than {MAX_NAME_LENGTH} characters")
+    return {
+        'name': name,
+        'ingredients': _lines(fields['ingredients'], 'ingredients'),
+        'instructions': _lines(fields['instructions'], 'instructions'),
+    }
+
+_SPACES = re.compile(r'\s+')
+
+def content_hash(ingredients, instructions):
+    """Digest of the recipe's lines, ignoring case, spacing and blank lines."""
+    h = hashlib.blake2b(digest_size=16)
+    for lines in (ingredients, instructions):
+        for line in lines:
+            line = _SPACES.sub(' ', line).strip().lower()
+            if line:
+                h.update(line.encode())
+                h.update(b'\x1f')
+        h.update(b'\x1e')
+    return h.digest()
+
+def existing_hashes(conn):
+    return {
+        content_hash(row[0].split('\n'), row[1].split('\n'))
+        for row in conn.execute("SELECT ingredients, instructions FROM recipies")
+    }
+
+def _peak_rss():
+    """Peak resident set so far, in bytes (includes the database's mmap)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def ingest(db_path, paths, batch_size=1000, snapshot_path=None, max_errors=20):
+    """
+    Load every file in `paths` into the database at `db_path`.
+    Returns counters: read, invalid, duplicate_name, duplicate_content,
+    inserted, bytes and timings.
+    """
+    conn = connect(db_path)
+    apply_migrations(conn, os.path.join(BASE_DIR, 'schema.sql'))
+    RecipeSearchIndex().ensure(conn)        # inserts are indexed by its triggers
+    stats = dict.fromkeys(('read', 'invalid', 'duplicate_name', 'duplicate_content',
+                           'inserted', 'bytes'), 0)
+    start = time.perf_counter()
+    hashes = existing_hashes(conn)
+    batch = []
+
+    def write():
+        added = insert_recipes(conn, batch, log_changes=False)
+        stats['inserted'] += len(added)
+        stats['duplicate_name'] += len(batch) - len(added)
+        batch.clear()
+
+    try:
+        for path in paths:
+            stats['bytes'] += os.path.getsize(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                records = iter_jsonl(f) if path.endswith(('.jsonl', '.ndjson')) else iter_json(f)
+                for location, record in records:
+                    stats['read'] += 1
+                    try:
+                        recipe = validate(record)
+                    except ValueError as e:
+                        stats['invalid'] += 1
+                        if stats['invalid'] <= max_errors:
+                            print(f"{path}: {location}: skipped, {e}")
+                        continue
+                    digest = content_hash(recipe['ingredients'], recipe['instructions'])
+                    if digest in hashes:
+                        stats['duplicate_content'] += 1
+                        continue
+                    hashes.add(digest)
+                    batch.append(recipe)
+                    if len(batch) >= batch_size:
+                        write()
+        if batch:
+            write()
+    finally:
+        stats['load_seconds'] = time.perf_counter() - start
+        stats['load_rss'] = _peak_rss()
+        # rebuild the in-memory indexes once and tell running processes to
+        # reload (also after a failure: earlier batches are committed)
+        start = time.perf_counter()
+        if stats['inserted']:
+            if snapshot_path:
+                load_indexes(conn, snapshot_path)
+            with conn:
+                log_change(conn, 'reindex', {'inserted': stats['inserted']})
+        stats['index_seconds'] = time.perf_counter() - start
+        stats['index_rss'] = _peak_rss()
+        conn.close()
+    return stats
+
+def report(stats):
+    load, index = stats['load_seconds'], stats['index_seconds']
+    print(f"read {stats['read']} records ({stats['bytes'] / 1e6:.1f} MB) in {load:.2f}s: "
+          f"{stats['read'] / max(load, 1e-9):,.0f} records/s, "
+          f"{stats['bytes'] / 1e6 / max(load, 1e-9):.1f} MB/s, "
+          f"{stats['inserted'] / max(load, 1e-9):,.0f} inserts/s")
+    print(f"inserted {stats['inserted']}, skipped {stats['invalid']} invalid, "
+          f"{stats['duplicate_name']} duplicate names, "
+          f"{stats['duplicate_content']} duplicate contents")
+    print(f"index rebuild {index:.2f}s; peak RSS {stats['load_rss'] / 1e6:.0f} MB "
+          f"loading, {stats['index_rss'] / 1e6:.0f} MB after the rebuild")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", metavar="FILE")
+    parser.add_argument("--db", default=os.environ.get("RECIPES_DB",
+                                                       os.path.join(BASE_DIR, "recipes.db")))
+    parser.add_argument("--snapshot", default=os.environ.get(
+        "INDEX_SNAPSHOT", os.path.join(BASE_DIR, "index_snapshot.bin")))
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="skip the index rebuild (app processes rebuild on reload)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-errors", type=int, default=20,
+                        help="invalid records to print (all are counted)")
+    args = parser.parse_args()
+    # every full batch takes longer than the web app's slow-query threshold
+    logging.getLogger("slow_query").setLevel(logging.ERROR)
+    try:
+        stats = ingest(args.db, args.paths, batch_size=args.batch_size,
+                       snapshot_path=None if args.no_snapshot else args.snapshot,
+                       max_errors=args.max_errors)
+    except (OSError, ValueError) as e:
+        print(f"Ingest failed: {e}")
+        sys.exit(1)
+    report(stats)
@@ -0,0 +1,211 @@
+import json
+import threading
+import time
+from priority_queue import PriorityQueue
+from db import get_pool
+
+class JobQueue:
+    """
+    Background jobs backed by the 'tasks' table.
+
+    submit() records a 'pending' row and queues it by priority (FIFO among
+    equal priorities); a pool of `workers` threads runs each job through the
+    handler registered for its kind. Every transition is written back:
+    pending → running → done | failed, and running → pending again when a
+    failed attempt is retried (up to `max_attempts`, with exponential
+    backoff). `limits` caps how many jobs of a kind run at once, e.g.
+    {'scrape': 1}; jobs over the cap wait without blocking other kinds.
+    Jobs left 'running' by a crashed process are re-queued on load().
+    Workers claim a job with a conditional UPDATE, so when several
+    processes share the table each job still runs once.
+    """
+
+    def __init__(self, db_path, workers=2, max_attempts=3, backoff=1.0, limits=None):
+        self.pool = get_pool(db_path)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.limits = dict(limits or {})
+        self.handlers = {}
+        self.queue = PriorityQueue()
+        self.deferred = {}        # kind -> [(priority, job_id)] waiting on its limit
+        self.running = {}         # kind -> jobs currently executing
+        self.cond = threading.Condition()
+        self._threads = []
+        self._stop = False
+
+    def register(self, kind, handler):
+        """handler(payload) -> JSON-serializable result; raise to fail."""
+        self.handlers[kind] = handler
+
+    def _update(self, job_id, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute(f"UPDATE tasks SET {assignments} WHERE id = ?",
+                             [*fields.values(), job_id])
+
+    def _push(self, priority, job_id):
+        with self.cond:
+            self.queue.insert(priority, job_id)
+            self.cond.notify()
+
+    def submit(self, kind, payload, priority=0):
+        """Persist and queue a job; returns its id."""
+        now = time.time()
+        with self.pool.connection() as conn:
+            with conn:
+                job_id = conn.execute(
+                    "INSERT INTO tasks(kind, priority, payload, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, 'pending', ?, ?)",
+                    (kind, priority, json.dumps(payload), now, now)
+                ).lastrowid
+        self._push(priority, job_id)
+        self.start()
+        return job_id
+
+    def load(self):
+        """Queue every pending job (and any left running by a crash)."""
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute("UPDATE tasks SET status = 'pending' WHERE status = 'running'")
+            rows = conn.execute(
+                "SELECT id, priority FROM tasks WHERE status = 'pending' ORDER BY id"
+            ).fetchall()
+        with self.cond:
+            self.queue.extend((r["priority"], r["id"]) for r in rows)
+            self.cond.notify_all()
+        return len(rows)
+
+    def get(self, job_id):
+        """The job's row as a dict (payload/result decoded), or None."""
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT id, kind, priority, payload, status, attempts, result, error, "
+                "created_at, updated_at FROM tasks WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._as_dict(row) if row else None
+
+    def list(self, status=None, limit=50):
+        """Most recent jobs first, optionally filtered by status."""
+        where, params = ("WHERE status = ?", [status]) if status else ("", [])
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, kind, priority, payload, status, attempts, result, error, "
+                f"created_at, updated_at FROM tasks {where} ORDER BY id DESC LIMIT ?",
+                [*params, limit]
+            ).fetchall()
+        return [self._as_dict(r) for r in rows]
+
+    @staticmethod
+    def _as_dict(row):
+        job = dict(row)
+        for field in ('payload', 'result'):
+            if job[field] is not None:
+                try:
+                    job[field] = json.loads(job[field])
+                except ValueError:
+                    pass        # legacy free-form payloads
+        return job
+
+    def stats(self):
+        with self.cond:
+            return {
+                'queued': len(self.queue),
+                'deferred': sum(len(v) for v in self.deferred.values()),
+                'running': sum(self.running.values()),
+                'workers': len(self._threads),
+            }
+
+    # ─── workers ─────────────────────────────────────────────────────────
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        with self.cond:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, daemon=True,
+                                          name=f"job-worker-{len(self._threads)}")
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        with self.cond:
+            self._stop = True
+            self.cond.notify_all()
+
+    def _next(self):
+        """
+        Block until a job under its kind's limit is available. The row is
+        read with the lock released so a slow database does not stall
+        submit(), stats() or the other workers.
+        """
+        while True:
+            with self.cond:
+                while not self._stop and self.queue.is_empty():
+                    self.cond.wait()
+                if self._stop:
+                    return None
+                priority, job_id = self.queue.extract_max()
+            job = self.get(job_id)
+            if job is None or job['status'] != 'pending':
+                continue
+            kind = job['kind']
+            with self.cond:
+                limit = self.limits.get(kind)
+                if limit is not None and self.running.get(kind, 0) >= limit:
+                    # a running job of this kind requeues it in _finished()
+                    self.deferred.setdefault(kind, []).append((priority, job_id))
+                    continue
+                self.running[kind] = self.running.get(kind, 0) + 1
+                return job
+
+    def _finished(self, kind):
+        with self.cond:
+            self.running[kind] -= 1
+            waiting = self.deferred.pop(kind, [])
+            self.queue.extend(waiting)
+            if waiting:
+                self.cond.notify_all()
+
+    def _work(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            try:
+                self._run(job)
+            finally:
+                self._finished(job['kind'])
+
+    def _claim(self, job_id):
+        """pending → running, unless another process got there first."""
+        with self.pool.connection() as conn:
+            with conn:
+                return conn.execute(
+                    "UPDATE tasks SET status = 'running', attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ? AND status = 'pending'",
+                    (time.time(), job_id)
+                ).rowcount == 1
+
+    def _run(self, job):
+        if not self._claim(job['id']):
+            return
+        attempts = job['attempts'] + 1
+        handler = self.handlers.get(job['kind'])
+        try:
+            if handler is None:
+                raise LookupError(f"no handler for job kind {job['kind']!r}")
+            result = handler(job['payload'])
+        except Exception as e:
+            if handler is not None and attempts < self.max_attempts:
+                self._update(job['id'], status='pending', error=str(e))
+                delay = self.backoff * 2 ** (attempts - 1)
+                timer = threading.Timer(delay, self._push, (job['priority'], job['id']))
+                timer.daemon = True
+                timer.start()
+            else:
+                print(f"Job {job['id']} ({job['kind']}) failed: {e}")
+                self._update(job['id'], status='failed', error=str(e))
+            return
+        self._update(job['id'], status='done', result=json.dumps(result), error=None)
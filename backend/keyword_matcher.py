@@ -0,0 +1,87 @@
+import json
+import os
+import re
+import threading
+
+DEFAULT_KEYWORDS = [
+    'native american', 'indigenous', 'tribal', 'first nations',
+    'wild rice', 'three sisters', 'succotash', 'pemmican', 'wojapi',
+    'bannock', 'fry bread', 'venison', 'elk', 'bison', 'buffalo',
+    'sumac', 'sage', 'cranberry', 'blueberry'
+]
+
+class KeywordMatcher:
+    """
+    Classifies recipes by keyword with one precompiled regex.
+    All keywords are combined into a single alternation (longest first),
+    so each text is scanned once no matter how many keywords there are.
+    Keywords must start on a word boundary ('sage' does not match 'sausage').
+
+    Keywords can be a list or a dict of keyword -> weight. When built from
+    a JSON file, reload_if_changed() picks up edits without a restart.
+    """
+
+    def __init__(self, keywords=None, title_weight=2.0, path=None):
+        self.path = path
+        self.title_weight = title_weight
+        self.mtime = None
+        self.lock = threading.Lock()
+        self.set_keywords(DEFAULT_KEYWORDS if keywords is None else keywords)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load keywords from a JSON list or {keyword: weight} object."""
+        matcher = cls(DEFAULT_KEYWORDS, path=path, **kwargs)
+        matcher.reload_if_changed()
+        return matcher
+
+    def set_keywords(self, keywords):
+        if not isinstance(keywords, dict):
+            keywords = {k: 1.0 for k in keywords}
+        weights = {k.lower().strip(): float(w) for k, w in keywords.items() if k.strip()}
+        alternation = '|'.join(
+            re.escape(k) for k in sorted(weights, key=len, reverse=True)
+        )
+        pattern = re.compile(rf'\b(?:{alternation})') if weights else None
+        with self.lock:
+            self.weights, self.pattern = weights, pattern
+
+    def reload_if_changed(self):
+        """Re-read the keyword file if it was modified. Returns True on reload."""
+        if not self.path:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+            if mtime == self.mtime:
+                return False
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.set_keywords(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error loading keywords: {e}")
+            return False
+        self.mtime = mtime
+        return True
+
+    def match(self, recipe_data):
+        """
+        Return (matched_keywords, score) for a recipe dict.
+        Each distinct keyword counts once, with its weight multiplied
+        by title_weight when it appears in the title.
+        """
+        with self.lock:
+            pattern, weights = self.pattern, self.weights
+        if pattern is None:
+            return set(), 0.0
+        title = recipe_data.get('name', '').lower()
+        body = ' '.join(recipe_data.get('ingredients', [])).lower()
+        in_title = set(pattern.findall(title))
+        matched = in_title | set(pattern.findall(body))
+        score = sum(
+            weights[k] * (self.title_weight if k in in_title else 1.0)
+            for k in matched
+        )
+        return matched, score
+
+    def is_match(self, recipe_data, min_score=0.0):
+        matched, score = self.match(recipe_data)
+        return bool(matched) and score >= min_score
@@ -1,119 +1,380 @@
-import os, re, sqlite3, time, heapq
-from flask import Flask, jsonify, request, g
+import gc, os, json, time
+from flask import Flask, Response, jsonify, request, g
 from flask_cors import CORS
-from trie import Trie
-from priority_queue import PriorityQueue
 from recipe_scraper import RecipeScraper
 from review import ReviewManager
+from search_index import RecipeSearchIndex
+from view_counter import ViewCounterBuffer
+from trending import TrendingIndex, WINDOWS
+from migrations import apply_migrations
+from indexes import load_indexes
+from response_cache import ResponseCache
+from recipe_store import recipe_dicts, iter_recipe_pages
+from text_tokens import ingredient_tokens
+from jobs import JobQueue
+from recipe_importer import recipe_importer, import_recipe_url
+from metrics import registry, instrument_app, SamplingProfiler
+from db import get_pool
+from changes import ChangeFeed
 from recipe_scrapers import scrape_me
 
 app = Flask(__name__)
 CORS(app)                       # allow localhost:3000 → 5000
 
+# ─── Instrumentation (per-route latency, status counts, in-flight) ───────
+# PROFILE_SAMPLE_RATE (0..1) profiles that share of requests with cProfile;
+# GET /metrics?dump_profiles=1 writes the stats to PROFILE_DIR.
+profiler = SamplingProfiler(
+    rate=float(os.environ.get("PROFILE_SAMPLE_RATE", 0)),
+    directory=os.environ.get("PROFILE_DIR"),
+)
+instrument_app(app, profiler)
+
 # ─── Paths & DB ───────────────────────────────────────────────────────────
-BASE_DIR    = os.path.dirname(os.path.abspath(__file__))
-DB_PATH     = os.path.join(BASE_DIR, "recipes.db")
-SCHEMA_PATH = os.path.join(BASE_DIR, "schema.sql")
+BASE_DIR      = os.path.dirname(os.path.abspath(__file__))
+DB_PATH       = os.environ.get("RECIPES_DB", os.path.join(BASE_DIR, "recipes.db"))
+SCHEMA_PATH   = os.path.join(BASE_DIR, "schema.sql")
+SNAPSHOT_PATH = os.environ.get("INDEX_SNAPSHOT",
+                               os.path.join(BASE_DIR, "index_snapshot.bin"))
 
-# ─── Reviews manager (JSON) ──────────────────────────────────────────────
-REVIEWS_FILE   = os.path.join(BASE_DIR, "reviews.json")
-review_manager = ReviewManager(REVIEWS_FILE)
+# ─── DB helper (pooled, tuned connections; see db.py) ────────────────────
+db_pool = get_pool(DB_PATH, max_idle=int(os.environ.get("DB_POOL_MAX_IDLE", 8)))
 
-# ─── DB helper ───────────────────────────────────────────────────────────
 def get_db():
     db = getattr(g, "_database", None)
     if db is None:
-        db = g._database = sqlite3.connect(DB_PATH)
-        db.row_factory = sqlite3.Row
+        db = g._database = db_pool.acquire()
     return db
 
 @app.teardown_appcontext
 def close_db(_):
-    db = getattr(g, "_database", None)
+    db = g.pop("_database", None)
     if db is not None:
-        db.close()
+        db_pool.release(db)
 
-# ─── Initialize schema & ensure view counter table ───────────────────────
+# ─── Response cache for read endpoints (ETag / 304) ──────────────────────
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get("RESPONSE_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", 60)),
+)
+
+# ─── Versioned schema migrations (seeding runs once, not every boot) ────
 with app.app_context():
-    db = get_db()
-    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-        db.executescript(f.read())
-    db.execute(
-        """CREATE TABLE IF NOT EXISTS recipe_views(
-               name  TEXT PRIMARY KEY,
-               views INTEGER NOT NULL DEFAULT 0
-           );"""
-    )
-    db.commit()
+    apply_migrations(get_db(), SCHEMA_PATH)
 
-# ─── Tries for autocomplete ──────────────────────────────────────────────
-recipe_trie     = Trie()
-ingredient_trie = Trie()
+# ─── Change feed from other worker processes (see changes.py) ───────────
+# Created before any state is loaded, so nothing written meanwhile is lost.
+change_feed = ChangeFeed(DB_PATH,
+                         interval=float(os.environ.get("CHANGE_POLL_INTERVAL", 1.0)))
 
-# ─── Priority queue (unused here) ────────────────────────────────────────
-task_queue = PriorityQueue()
+# ─── Reviews manager (SQLite, seeded from the legacy JSON file) ──────────
+REVIEWS_FILE   = os.environ.get("REVIEWS_FILE", os.path.join(BASE_DIR, "reviews.json"))
+# review bodies are loaded per recipe; REVIEW_CACHE_SIZE recipes stay in memory
+review_manager = ReviewManager(REVIEWS_FILE, db_path=DB_PATH,
+                               cache_size=int(os.environ.get("REVIEW_CACHE_SIZE", 1024)))
 
-def load_tasks_from_db():
-    rows = get_db().execute(
-        "SELECT id, priority, payload FROM tasks WHERE status='pending'"
-    ).fetchall()
-    for r in rows:
-        task_queue.insert(r["priority"], (r["id"], r["payload"]))
+# ─── Buffered view counters ──────────────────────────────────────────────
+# At most VIEW_FLUSH_MAX_PENDING views / VIEW_FLUSH_INTERVAL seconds of views
+# can be lost on a crash; VIEW_FLUSH_MAX_PENDING=0 writes every view through.
+view_buffer = ViewCounterBuffer(
+    DB_PATH,
+    max_pending=int(os.environ.get("VIEW_FLUSH_MAX_PENDING", 100)),
+    flush_interval=float(os.environ.get("VIEW_FLUSH_INTERVAL", 5.0)),
+    on_flush=lambda counts: response_cache.invalidate("trending"),
+)
+
+# ─── Trending (time-decayed view rankings, kept in memory) ───────────────
+trending_index = TrendingIndex()
+with app.app_context():
+    trending_index.load(get_db())
+
+# ─── Full-text search index (FTS5, synced by triggers) ───────────────────
+search_index = RecipeSearchIndex()
+with app.app_context():
+    search_index.ensure(get_db())
 
+# ─── Tries & infix index for autocomplete ────────────────────────────────
+# Built by indexes.build_indexes and cached in the snapshot at SNAPSHOT_PATH.
 with app.app_context():
-    cur = get_db().execute("SELECT name, ingredients FROM recipies")
-    for row in cur.fetchall():
-        recipe_trie.insert(row["name"])
-        for token in re.findall(r"[A-Za-z]+", row["ingredients"]):
-            ingredient_trie.insert(token.lower())
-    load_tasks_from_db()
+    _indexes = load_indexes(get_db(), SNAPSHOT_PATH)
+recipe_trie     = _indexes["recipe_trie"]
+ingredient_trie = _indexes["ingredient_trie"]
+recipe_index    = _indexes["recipe_index"]
+pantry_index    = _indexes["pantry_index"]
+similar_index   = _indexes["similar_index"]
+
+def index_recipe(recipe):
+    """
+    Add a newly saved recipe to every in-memory index.
+    Pass as RecipeScraper(DB_PATH, on_save=index_recipe).
+    """
+    ingredients = "\n".join(recipe["ingredients"])
+    recipe_trie.insert(recipe["name"])
+    recipe_index.add(recipe["name"])
+    for token in ingredient_tokens(ingredients):
+        ingredient_trie.insert(token)
+    pantry_index.add(recipe["name"], ingredients)
+    similar_index.add(recipe["name"], ingredients)
+    response_cache.invalidate("recipes")
+
+def apply_popularity(db):
+    for row in db.execute("SELECT name, views FROM recipe_views"):
+        recipe_index.set_popularity(row["name"], row["views"])
+        # trie frequency = 1 + views, so fuzzy matches rank by popularity
+        recipe_trie.raise_frequency(row["name"], row["views"] + 1)
+
+with app.app_context():
+    apply_popularity(get_db())
+
+# ─── Background jobs (scraping & imports, persisted in 'tasks') ─────────
+# JOB_WORKERS threads run queued jobs; at most JOB_SCRAPE_LIMIT bulk scrapes
+# at once, so imports always find a free worker.
+job_queue = JobQueue(
+    DB_PATH,
+    workers=int(os.environ.get("JOB_WORKERS", 2)),
+    max_attempts=int(os.environ.get("JOB_MAX_ATTEMPTS", 3)),
+    limits={"scrape": int(os.environ.get("JOB_SCRAPE_LIMIT", 1))},
+)
+app.extensions["jobs"] = job_queue
+_scraper = None
+
+def scrape_job(payload):
+    global _scraper
+    if _scraper is None:
+        _scraper = RecipeScraper(DB_PATH, on_save=index_recipe)
+    errors = {}
+    added  = _scraper.scrape_recipes_from_urls(payload["urls"], errors)
+    if errors and len(errors) == len(set(payload["urls"])):
+        # nothing could be fetched: fail, so the job is retried
+        raise RuntimeError(f"all {len(errors)} URLs failed, e.g. {next(iter(errors.values()))}")
+    return {"added": [recipe["name"] for recipe in added], "errors": errors}
+
+job_queue.register("scrape", scrape_job)
+job_queue.register("import", lambda payload: import_recipe_url(payload["url"]))
+job_queue.load()
+
+app.register_blueprint(recipe_importer)
+
+# ─── Applying other workers' changes ────────────────────────────────────
+def apply_recipe(payload):
+    if payload["name"] not in recipe_index:
+        index_recipe({"name": payload["name"],
+                      "ingredients": payload["ingredients"].split("\n")})
+
+def apply_review(payload):
+    if review_manager.apply_remote_review(payload):
+        response_cache.invalidate(f"reviews:{payload['recipe_name']}", "recipes")
+
+def apply_views(payload):
+    for name, count in payload["counts"].items():
+        trending_index.record(name, count, t=payload["t"])
+        recipe_index.bump(name, count)
+        if name.lower() in recipe_trie:
+            recipe_trie.insert(name, count)
+    response_cache.invalidate("trending")
+
+def apply_reindex(payload):
+    # a bulk load (ingest.py) replaces its per-recipe changes with this one
+    # and leaves a fresh snapshot behind, so this is usually just a load
+    global recipe_trie, ingredient_trie, recipe_index, pantry_index, similar_index
+    with db_pool.connection() as db:
+        indexes = load_indexes(db, SNAPSHOT_PATH)
+        recipe_trie     = indexes["recipe_trie"]
+        ingredient_trie = indexes["ingredient_trie"]
+        recipe_index    = indexes["recipe_index"]
+        pantry_index    = indexes["pantry_index"]
+        similar_index   = indexes["similar_index"]
+        apply_popularity(db)
+    response_cache.invalidate("recipes")
+
+change_feed.register("recipe", apply_recipe)
+change_feed.register("reindex", apply_reindex)
+change_feed.register("review", apply_review)
+change_feed.register("views", apply_views)
+
+# ─── Multi-process mode (gunicorn -c gunicorn.conf.py main:app) ─────────
+# With preload_app the master imports this module once and forks workers,
+# so the indexes built above are shared copy-on-write instead of rebuilt
+# per worker. No SQLite handle or thread may cross fork(): the master
+# closes its connections first, and each worker reopens them and starts
+# its own change feed and job workers.
+def start_background():
+    change_feed.start()
+    job_queue.start()
+
+def before_fork():
+    db_pool.close()
+    review_manager.conn.close()
+    view_buffer.release_connection()
+    change_feed.close()
+    # move everything allocated so far out of the collector's reach, so
+    # GC passes in the workers do not write to (and copy) shared pages
+    gc.freeze()
+
+def after_fork():
+    review_manager.reconnect()
+    start_background()
+
+if os.environ.get("MULTIPROCESS") != "1":
+    start_background()
 
 # ─────────────────────────────  ROUTES  ──────────────────────────────────
+def limit_arg(default, high):
+    """
+    The `limit` query arg, capped at `high`; `default` if absent.
+    None when it is not an integer or is below 1 (callers answer 400).
+    """
+    raw = request.args.get("limit")
+    if raw is None:
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        return None
+    return min(limit, high) if limit >= 1 else None
+
+def bad_limit(high):
+    return jsonify(success=False, error=f"limit must be an integer from 1 to {high}"), 400
+
+GREATLAKES_MAX_LIMIT = 1000
+
 @app.route("/get-greatlakes")
+@response_cache.cached(tags=["recipes"])
 def get_recipes():
+    """
+    List recipes, optionally filtered.
+      q          – full-text search over name, ingredients and instructions
+      name       – words matched against the recipe name
+      ingredient – words matched against the ingredient list
+      mode       – 'fts' (default, tokenized prefix match ranked by BM25)
+                   or 'like' (legacy substring match)
+      limit      – maximum number of recipes to return (1..1000)
+      after      – cursor: only recipes with id > after (id-ordered listings);
+                   pass the returned next_after to get the next page. FTS
+                   results are ranked, so they ignore it and return no
+                   next_after
+      format     – 'json' (default) or 'ndjson' (streamed, one recipe per line)
+    """
+    text_q = request.args.get("q", "").lower().strip()
     name_q = request.args.get("name", "").lower().strip()
     ing_q  = request.args.get("ingredient", "").lower().strip()
+    mode   = request.args.get("mode", "fts")
+    limit  = limit_arg(None, GREATLAKES_MAX_LIMIT)
+    after  = request.args.get("after", 0, type=int)
+    fmt    = request.args.get("format", "json")
+    if limit is None and "limit" in request.args:
+        return bad_limit(GREATLAKES_MAX_LIMIT)
+    filtered = bool(text_q or name_q or ing_q)
+    ranked   = filtered and mode == "fts" and search_index.available
+
+    def pages(db):
+        if ranked:
+            # ranked by relevance, so `after` does not apply
+            match = search_index.match_query(text_q, name_q, ing_q)
+            rows  = search_index.search(db, match, limit=limit) if match else []
+            yield recipe_dicts(db, rows)
+            return
+        clauses, params = [], []
+        if text_q:
+            clauses.append("(LOWER(name) LIKE ? OR LOWER(ingredients) LIKE ?"
+                           " OR LOWER(instructions) LIKE ?)")
+            params += [f"%{text_q}%"] * 3
+        if name_q:
+            clauses.append("LOWER(name) LIKE ?");        params.append(f"%{name_q}%")
+        if ing_q:
+            clauses.append("LOWER(ingredients) LIKE ?"); params.append(f"%{ing_q}%")
+        yield from iter_recipe_pages(db, " AND ".join(clauses), params,
+                                     after=after, limit=limit)
 
-    sql = "SELECT id, name, ingredients, instructions FROM recipies"
-    clauses, params = [], []
-    if name_q:
-        clauses.append("LOWER(name) LIKE ?");        params.append(f"%{name_q}%")
-    if ing_q:
-        clauses.append("LOWER(ingredients) LIKE ?"); params.append(f"%{ing_q}%")
-    if clauses:
-        sql += " WHERE " + " AND ".join(clauses)
-
-    rows = get_db().execute(sql, params).fetchall()
-    out  = []
-    for r in rows:
-        out.append({
-            "id":             r["id"],
-            "name":           r["name"],
-            "ingredients":    r["ingredients"].split("\n"),
-            "instructions":   r["instructions"].split("\n"),
-            "average_rating": review_manager.get_average_rating(r["name"])
-        })
-    return jsonify({"Great Lakes": out,
-                    "message": "Filtered results" if clauses else "All recipes"})
+    def with_ratings(page):
+        for recipe in page:
+            recipe["average_rating"] = review_manager.get_average_rating(recipe["name"])
+        return page
+
+    if fmt == "ndjson":
+        def stream():
+            # the request's connection is closed at teardown, before the
+            # body is sent, so the stream reads through its own connection
+            with db_pool.connection() as db:
+                for page in pages(db):
+                    for recipe in with_ratings(page):
+                        yield json.dumps(recipe) + "\n"
+        return Response(stream(), mimetype="application/x-ndjson")
+
+    out = [recipe for page in pages(get_db()) for recipe in with_ratings(page)]
+    body = {"Great Lakes": out,
+            "message": "Filtered results" if filtered else "All recipes"}
+    # only id-ordered listings can be continued; ranked results have no cursor
+    if not ranked and limit is not None and len(out) == limit and out:
+        body["next_after"] = out[-1]["id"]
+    return jsonify(body)
 
 # ─── Autosuggest ─────────────────────────────────────────────────────────
+# Exact matches come first; when there are fewer than 10, typo-tolerant
+# prefix matches from the tries fill the rest (fuzzy=0 turns this off).
+SUGGEST_LIMIT = 10
+
+def with_fuzzy(exact, trie, q, display=lambda word: word):
+    if len(exact) >= SUGGEST_LIMIT or request.args.get("fuzzy") == "0":
+        return exact
+    out, seen = list(exact), {word.lower() for word in exact}
+    for word, _ in trie.fuzzy_search(q, limit=SUGGEST_LIMIT):
+        if word not in seen:
+            seen.add(word)
+            out.append(display(word) or word)
+    return out[:SUGGEST_LIMIT]
+
 @app.route("/suggest-recipes")
 def suggest_recipes():
     q = request.args.get("q", "").lower().strip()
     if not q:
         return jsonify(suggestions=[])
-    rows = get_db().execute(
-        "SELECT name FROM recipies WHERE LOWER(name) LIKE ? LIMIT 10",
-        (f"%{q}%",)
-    ).fetchall()
-    return jsonify(suggestions=[r["name"] for r in rows])
+    exact = recipe_index.suggest(q, limit=SUGGEST_LIMIT, prefixes=recipe_trie.autocomplete)
+    return jsonify(suggestions=with_fuzzy(exact, recipe_trie, q, recipe_index.get))
 
 @app.route("/suggest-ingredients")
 def suggest_ingredients():
     q = request.args.get("q", "").lower().strip()
     if not q:
         return jsonify(suggestions=[])
-    return jsonify(suggestions=ingredient_trie.autocomplete(q)[:10])
+    exact = ingredient_trie.autocomplete(q, limit=SUGGEST_LIMIT)
+    return jsonify(suggestions=with_fuzzy(exact, ingredient_trie, q))
+
+# ─── Pantry matcher ("what can I cook") ──────────────────────────────────
+@app.route("/pantry-match", methods=["POST"])
+def pantry_match():
+    """
+    Rank recipes by how much of them the pantry covers.
+    Body: {"ingredients": [...], "max_missing": 1, "limit": 20}
+    """
+    data  = request.get_json() or {}
+    items = data.get("ingredients") or []
+    if not isinstance(items, list) or not items:
+        return jsonify(success=False, error="Missing ingredients list"), 400
+    try:
+        max_missing = int(data.get("max_missing", 1))
+        limit       = int(data.get("limit", 20))
+    except (TypeError, ValueError):
+        return jsonify(success=False, error="max_missing and limit must be integers"), 400
+    if max_missing < 0 or limit < 0:
+        return jsonify(success=False, error="max_missing and limit must be >= 0"), 400
+    matches, unknown = pantry_index.match(
+        [str(i) for i in items], max_missing=max_missing, limit=min(limit, 500),
+    )
+    return jsonify(success=True, matches=matches, unknown=unknown)
+
+# ─── Similar recipes (precomputed ingredient TF-IDF neighbours) ─────────
+@app.route("/similar/<recipe_name>")
+@response_cache.cached(tags=["recipes"])
+def similar_recipes(recipe_name):
+    limit = limit_arg(10, similar_index.k)
+    if limit is None:
+        return bad_limit(similar_index.k)
+    if recipe_name not in similar_index:
+        return jsonify(success=False, error="Unknown recipe"), 404
+    out = [{"name": name, "score": round(score, 4)}
+           for name, score in similar_index.similar(recipe_name, limit)]
+    return jsonify(success=True, recipe=recipe_name, similar=out)
 
 # ─── Record a view (CORS-safe) ───────────────────────────────────────────
 @app.route("/record-view", methods=["POST", "OPTIONS"])
@@ -127,36 +388,78 @@ def record_view():
     if not name:
         return jsonify(success=False, error="Missing recipe name"), 400
 
-    db = get_db()
-    db.execute(
-        """INSERT INTO recipe_views(name, views) VALUES(?,1)
-           ON CONFLICT(name) DO UPDATE SET views = views + 1""",
-        (name,)
-    )
-    db.commit()
+    now = time.time()
+    view_buffer.increment(name, t=now)
+    trending_index.record(name, t=now)
+    recipe_index.bump(name)
+    if name.lower() in recipe_trie:
+        recipe_trie.insert(name)
     return jsonify(success=True)
 
-# ─── Trending by view count ──────────────────────────────────────────────
-@app.route("/trending")
-def trending():
-    """Return top-N recipes ranked by view count using a max-heap."""
-    limit = int(request.args.get("limit", 10))
+# ─── Batch variants (one request instead of N) ──────────────────────────
+BATCH_LIMIT = 500
 
-    # 1. Fetch all view counters (name, views)
-    rows = get_db().execute(
-        "SELECT name, views FROM recipe_views"
-    ).fetchall()
+def batch_names(data, key="names"):
+    names = data.get(key)
+    if not isinstance(names, list) or not names:
+        return None
+    return list(dict.fromkeys(str(n) for n in names if n))[:BATCH_LIMIT]
 
-    # 2. Build a list of tuples (views, name)
-    tuples = [(row["views"], row["name"]) for row in rows]
+@app.route("/record-views", methods=["POST", "OPTIONS"])
+def record_views():
+    """
+    Record many views at once, applied in a single transaction.
+    Body: {"views": ["Recipe A", {"name": "Recipe B", "count": 3}, ...]}
+    """
+    if request.method == "OPTIONS":
+        return ("", 204)
+    events = (request.get_json() or {}).get("views")
+    if not isinstance(events, list) or not events:
+        return jsonify(success=False, error="Missing views list"), 400
+    counts = {}
+    for event in events[:BATCH_LIMIT * 10]:
+        if isinstance(event, dict):
+            name, count = str(event.get("name") or "").strip(), event.get("count", 1)
+        else:
+            name, count = str(event or "").strip(), 1
+        try:
+            count = max(1, min(int(count), 100))
+        except (TypeError, ValueError):
+            continue
+        if name:
+            counts[name] = counts.get(name, 0) + count
+    if not counts:
+        return jsonify(success=False, error="Missing recipe names"), 400
 
-    # 3. Extract N largest items with a max-heap (heapq.nlargest)
-    top = heapq.nlargest(limit, tuples, key=lambda t: t[0])
+    now = time.time()
+    view_buffer.increment_many(counts, t=now)
+    for name, count in counts.items():
+        trending_index.record(name, count, t=now)
+        recipe_index.bump(name, count)
+        if name.lower() in recipe_trie:
+            recipe_trie.insert(name, count)
+    return jsonify(success=True, recorded=sum(counts.values()))
 
-    # 4. Re-shape for JSON
-    out = [{"name": name, "views": views} for views, name in top]
-    return jsonify(success=True, trending=out)
-# ─── Reviews, import, etc. (unchanged) ──────────────────────────────────
+# ─── Trending by recent views ────────────────────────────────────────────
+@app.route("/trending")
+@response_cache.cached(tags=["trending"], ttl=10)
+def trending():
+    """
+    Return top-N recipes for a time window, served from memory.
+      window – hour | day | week (exponentially decayed views, half-life
+               equal to the window) or all (all-time view count)
+    """
+    limit  = int(request.args.get("limit", 10))
+    window = request.args.get("window", "week")
+    if window not in WINDOWS:
+        return jsonify(success=False,
+                       error=f"window must be one of {', '.join(WINDOWS)}"), 400
+
+    out = [{"name": name, "views": views, "score": round(score, 3)}
+           for name, score, views in trending_index.top(window, limit)]
+    return jsonify(success=True, window=window, trending=out)
+
+# ─── Reviews ─────────────────────────────────────────────────────────────
 @app.route("/add-review", methods=["POST"])
 def add_review():
     data    = request.get_json() or {}
@@ -170,15 +473,94 @@ def add_review():
     if not 1 <= rating <= 5:
         return jsonify(success=False, error="Rating must be 1–5"), 400
     rev = review_manager.add_review(name, user, rating, comment)
+    # listings embed average ratings
+    response_cache.invalidate(f"reviews:{name}", "recipes")
     return jsonify(success=True, review=rev)
 
 @app.route("/get-reviews/<recipe_name>")
+@response_cache.cached(tags=lambda recipe_name: [f"reviews:{recipe_name}"])
 def get_reviews(recipe_name):
     return jsonify(success=True,
                    reviews=review_manager.get_all_reviews(recipe_name),
                    average_rating=review_manager.get_average_rating(recipe_name))
 
-# other endpoints (get-top-rated, import-recipe, scraping…) remain unchanged
+@app.route("/get-reviews-batch", methods=["POST"])
+def get_reviews_batch():
+    """Body: {"names": [...]} → {name: {reviews, average_rating}}."""
+    names = batch_names(request.get_json() or {})
+    if names is None:
+        return jsonify(success=False, error="Missing names list"), 400
+    return jsonify(success=True, reviews=review_manager.get_reviews_batch(names))
+
+@app.route("/get-average-ratings", methods=["POST"])
+def get_average_ratings():
+    """Body: {"names": [...]} → {name: average_rating}."""
+    names = batch_names(request.get_json() or {})
+    if names is None:
+        return jsonify(success=False, error="Missing names list"), 400
+    return jsonify(success=True, ratings=review_manager.get_average_ratings(names))
+
+@app.route("/get-top-rated-recipes")
+def get_top_rated_recipes():
+    limit = int(request.args.get("limit", 10))
+    return jsonify(success=True,
+                   top_recipes=review_manager.get_top_rated_recipes(limit))
+
+# ─── Bulk scraping (queued as a job) ─────────────────────────────────────
+@app.route("/scrape-native-recipes", methods=["POST"])
+def scrape_native_recipes():
+    """Queue a bulk scrape of {"urls": [...]}; poll status_url for the result."""
+    data = request.get_json() or {}
+    urls = [u for u in data.get("urls") or [] if isinstance(u, str) and u.strip()]
+    if not urls:
+        return jsonify(success=False, error="No URLs provided"), 400
+    job_id = job_queue.submit("scrape", {"urls": urls})
+    return jsonify(success=True, job_id=job_id, status="pending",
+                   status_url=f"/jobs/{job_id}"), 202
+
+# ─── Job status ──────────────────────────────────────────────────────────
+@app.route("/jobs/<int:job_id>")
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify(success=False, error="No such job"), 404
+    return jsonify(success=True, job=job)
+
+JOBS_MAX_LIMIT = 500
+
+@app.route("/jobs")
+def list_jobs():
+    limit = limit_arg(50, JOBS_MAX_LIMIT)
+    if limit is None:
+        return bad_limit(JOBS_MAX_LIMIT)
+    return jsonify(success=True,
+                   jobs=job_queue.list(request.args.get("status"), limit),
+                   stats=job_queue.stats())
+
+# ─── Metrics (Prometheus text format) ────────────────────────────────────
+registry.describe("response_cache_hits", "gauge", "Response cache hits since start")
+registry.describe("response_cache_misses", "gauge", "Response cache misses since start")
+registry.describe("view_buffer_pending", "gauge", "Views buffered but not yet flushed")
+registry.describe("jobs", "gauge", "Background jobs by state")
+registry.describe("change_feed_applied", "gauge", "Changes applied from other worker processes")
+registry.describe("db_pool_connections", "gauge", "SQLite pool connection counts by state")
+registry.describe("review_memory", "gauge", "Review manager memory (bytes) and cache counts by kind")
+
+@app.route("/metrics")
+def metrics():
+    if request.args.get("dump_profiles"):
+        profiler.dump()
+    registry.set("response_cache_hits", response_cache.hits)
+    registry.set("response_cache_misses", response_cache.misses)
+    registry.set("view_buffer_pending", sum(view_buffer.pending_counts().values()))
+    for stat, value in job_queue.stats().items():
+        registry.set("jobs", value, state=stat)
+    registry.set("change_feed_applied", change_feed.applied)
+    for stat, value in db_pool.stats().items():
+        registry.set("db_pool_connections", value, state=stat)
+    for stat, value in review_manager.memory_footprint().items():
+        registry.set("review_memory", value, kind=stat)
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,313 @@
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import random
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+# Minimal in-process metrics with Prometheus text exposition.
+# Counters, gauges and histograms are keyed by (name, sorted label pairs).
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+slow_log = logging.getLogger("slow_query")
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}     # key -> [bucket counts..., +Inf count, sum]
+        self.help = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[self._key(name, labels)] = value
+
+    def add(self, name, amount, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.gauges[key] = self.gauges.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        i = bisect_left(DEFAULT_BUCKETS, value)
+        with self.lock:
+            h = self.histograms.get(key)
+            if h is None:
+                h = self.histograms[key] = [0] * (len(DEFAULT_BUCKETS) + 2)
+            h[i] += 1
+            h[-1] += value
+
+    @staticmethod
+    def _labels(pairs, extra=()):
+        pairs = list(pairs) + list(extra)
+        if not pairs:
+            return ""
+        body = ",".join(
+            f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+            for k, v in pairs
+        )
+        return "{" + body + "}"
+
+    def render(self):
+        """Prometheus text format (version 0.0.4)."""
+        lines, seen = [], set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                kind, text = self.help.get(name, (kind, name))
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted((k, list(v)) for k, v in self.histograms.items())
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{name}{self._labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            header(name, "gauge")
+            lines.append(f"{name}{self._labels(labels)} {value}")
+        for (name, labels), h in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, count in zip(DEFAULT_BUCKETS, h):
+                cumulative += count
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', bound)])} {cumulative}")
+            cumulative += h[len(DEFAULT_BUCKETS)]
+            lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {cumulative}")
+            lines.append(f"{name}_count{self._labels(labels)} {cumulative}")
+            lines.append(f"{name}_sum{self._labels(labels)} {h[-1]}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+registry.describe("http_request_duration_seconds", "histogram", "Request latency by route")
+registry.describe("http_requests_total", "counter", "Requests by route and status")
+registry.describe("http_requests_in_flight", "gauge", "Requests currently being served")
+registry.describe("sql_query_duration_seconds", "histogram", "SQL statement latency")
+registry.describe("sql_rows_total", "counter", "Rows returned or changed by SQL statements")
+registry.describe("sql_slow_queries_total", "counter", "Statements slower than the slow-query threshold")
+registry.describe("function_duration_seconds", "histogram", "Latency of instrumented functions")
+
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_MS", 100)) / 1000
+
+# ─── SQL instrumentation ─────────────────────────────────────────────────
+_VERB = re.compile(r"\s*(\w+)")
+
+def _statement_kind(sql):
+    m = _VERB.match(sql)
+    return m.group(1).upper() if m else "OTHER"
+
+def _record_sql(sql, elapsed, rows):
+    kind = _statement_kind(sql)
+    registry.observe("sql_query_duration_seconds", elapsed, statement=kind)
+    if rows:
+        registry.inc("sql_rows_total", rows, statement=kind)
+    if elapsed >= SLOW_QUERY_SECONDS:
+        registry.inc("sql_slow_queries_total", statement=kind)
+        slow_log.warning("slow query (%.1f ms, %s rows): %s",
+                         elapsed * 1000, rows, " ".join(sql.split())[:500])
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    Cursor that times each statement and counts the rows it produces.
+    Only time spent inside execute and the fetch calls is counted, not
+    what the caller does between rows; a statement is recorded once its
+    results are exhausted (or the cursor is closed, reused or dropped).
+    """
+
+    _sql = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        t = time.perf_counter()
+        super().execute(sql, parameters)
+        self._sql, self._elapsed, self._rows = sql, time.perf_counter() - t, 0
+        if self.description is None:
+            # no result set: timing and rowcount are final now
+            self._rows = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        t = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        _record_sql(sql, time.perf_counter() - t, max(self.rowcount, 0))
+        return self
+
+    def _fetched(self, started, rows):
+        if self._sql is not None:
+            self._elapsed += time.perf_counter() - started
+            self._rows += rows
+
+    def _finish(self):
+        sql = self._sql
+        if sql is not None:
+            self._sql = None
+            _record_sql(sql, self._elapsed, self._rows)
+
+    def fetchall(self):
+        t = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(t, len(rows))
+        self._finish()
+        return rows
+
+    def fetchone(self):
+        t = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(t, 0 if row is None else 1)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        t = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(t, len(rows))
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(t, 0)
+            self._finish()
+            raise
+        self._fetched(t, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Pass as sqlite3.connect(..., factory=InstrumentedConnection)."""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+# ─── Function timing ─────────────────────────────────────────────────────
+def timed(name):
+    """Decorator: observe a function's latency as function_duration_seconds{function=name}."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.observe("function_duration_seconds",
+                                 time.perf_counter() - t, function=name)
+        return wrapper
+    return decorator
+
+# ─── Flask integration ───────────────────────────────────────────────────
+class SamplingProfiler:
+    """
+    Opt-in: profile a random `rate` share of requests with cProfile and
+    keep aggregated stats per route; dump() writes them to `directory`.
+    """
+
+    def __init__(self, rate=0.0, directory=None):
+        self.rate = rate
+        self.directory = directory
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.rate <= 0 or random.random() >= self.rate:
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, profile, route):
+        profile.disable()
+        with self.lock:
+            if route in self.stats:
+                self.stats[route].add(profile)
+            else:
+                self.stats[route] = pstats.Stats(profile)
+
+    def dump(self):
+        if not self.directory:
+            return []
+        os.makedirs(self.directory, exist_ok=True)
+        paths = []
+        with self.lock:
+            for route, stats in self.stats.items():
+                safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", route).strip("_") or "root"
+                path = os.path.join(self.directory, f"{safe}.pstats")
+                stats.dump_stats(path)
+                paths.append(path)
+        return paths
+
+def instrument_app(app, profiler=None):
+    """Record per-route latency, status counts and in-flight requests."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = time.perf_counter()
+        g._metrics_profile = profiler.start() if profiler else None
+        registry.add("http_requests_in_flight", 1)
+
+    @app.teardown_request
+    def _stop_timer(error=None):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return
+        registry.add("http_requests_in_flight", -1)
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        registry.observe("http_request_duration_seconds",
+                         time.perf_counter() - start,
+                         method=request.method, route=route)
+        profile = g.pop("_metrics_profile", None)
+        if profile is not None:
+            profiler.stop(profile, f"{request.method} {route}")
+
+    @app.after_request
+    def _count_status(response):
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        registry.inc("http_requests_total", method=request.method,
+                     route=route, status=response.status_code)
+        return response
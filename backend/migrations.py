@@ -0,0 +1,140 @@
+import sqlite3
+from recipe_store import create_line_tables, backfill_lines
+from changes import create_change_log
+
+# Versioned schema steps, applied in order and recorded in PRAGMA user_version.
+# Never edit a released step; append a new one instead. Steps must be
+# idempotent (IF NOT EXISTS / OR IGNORE): executescript commits as it goes,
+# so a crash can leave a step applied but not yet recorded.
+
+def _base_tables(conn, schema_path):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS recipies(
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            name         TEXT NOT NULL,
+            ingredients  TEXT NOT NULL DEFAULT '',
+            instructions TEXT NOT NULL DEFAULT ''
+        );
+        CREATE TABLE IF NOT EXISTS tasks(
+            id       INTEGER PRIMARY KEY AUTOINCREMENT,
+            priority INTEGER NOT NULL DEFAULT 0,
+            payload  TEXT,
+            status   TEXT NOT NULL DEFAULT 'pending'
+        );
+        CREATE TABLE IF NOT EXISTS recipe_views(
+            name  TEXT PRIMARY KEY,
+            views INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS recipe_view_buckets(
+            name  TEXT NOT NULL,
+            hour  INTEGER NOT NULL,          -- unix time // 3600
+            views INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY(name, hour)
+        );
+    """)
+
+def _unique_names(conn, schema_path):
+    # older databases re-ran the seed INSERTs on every boot
+    conn.executescript("""
+        DELETE FROM recipies
+         WHERE id NOT IN (SELECT MIN(id) FROM recipies GROUP BY name);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_recipe_name ON recipies(name);
+    """)
+
+def _change_counter(conn, schema_path):
+    # bumped on every recipe write; derived indexes are keyed by it
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS index_state(
+            key   TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO index_state(key, value) VALUES ('recipes', 0);
+        -- random id so a recreated database never matches an old snapshot
+        INSERT OR IGNORE INTO index_state(key, value) VALUES ('instance', abs(random()));
+        CREATE TRIGGER IF NOT EXISTS recipies_gen_ai AFTER INSERT ON recipies BEGIN
+            UPDATE index_state SET value = value + 1 WHERE key = 'recipes';
+        END;
+        CREATE TRIGGER IF NOT EXISTS recipies_gen_ad AFTER DELETE ON recipies BEGIN
+            UPDATE index_state SET value = value + 1 WHERE key = 'recipes';
+        END;
+        CREATE TRIGGER IF NOT EXISTS recipies_gen_au AFTER UPDATE ON recipies BEGIN
+            UPDATE index_state SET value = value + 1 WHERE key = 'recipes';
+        END;
+    """)
+
+def _seed_recipes(conn, schema_path):
+    with open(schema_path, "r", encoding="utf-8") as f:
+        conn.executescript(f.read())
+
+def _recipe_lines(conn, schema_path):
+    create_line_tables(conn)
+    backfill_lines(conn)
+
+def _job_columns(conn, schema_path):
+    # background jobs (jobs.py): kind, retry bookkeeping and outcome
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    for name, decl in (("kind",       "TEXT"),
+                       ("attempts",   "INTEGER NOT NULL DEFAULT 0"),
+                       ("result",     "TEXT"),
+                       ("error",      "TEXT"),
+                       ("created_at", "REAL"),
+                       ("updated_at", "REAL")):
+        if name not in columns:
+            conn.execute(f"ALTER TABLE tasks ADD COLUMN {name} {decl}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, id)")
+
+def _change_log(conn, schema_path):
+    # cross-process change feed (changes.py); recipe inserts log themselves
+    create_change_log(conn)
+    conn.executescript("""
+        CREATE TRIGGER IF NOT EXISTS recipies_log_ai AFTER INSERT ON recipies BEGIN
+            INSERT INTO change_log(origin, kind, payload, created_at)
+            VALUES (NULL, 'recipe',
+                    json_object('name', new.name, 'ingredients', new.ingredients),
+                    (julianday('now') - 2440587.5) * 86400.0);
+        END;
+    """)
+
+MIGRATIONS = [
+    (1, "base tables", _base_tables),
+    (2, "unique recipe names", _unique_names),
+    (3, "recipe change counter", _change_counter),
+    (4, "seed recipes from schema.sql", _seed_recipes),
+    (5, "normalized ingredient/instruction rows", _recipe_lines),
+    (6, "background job columns on tasks", _job_columns),
+    (7, "cross-process change log", _change_log),
+]
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def apply_migrations(conn, schema_path, migrations=MIGRATIONS):
+    """
+    Run every migration newer than the database's user_version.
+    Returns the list of versions applied (empty when up to date).
+    """
+    applied = []
+    current = schema_version(conn)
+    for version, description, step in migrations:
+        if version <= current:
+            continue
+        try:
+            step(conn, schema_path)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise RuntimeError(f"migration {version} ({description}) failed: {e}") from e
+        applied.append(version)
+    return applied
+
+def recipes_generation(conn):
+    """
+    Identify the current contents of 'recipies' for cache keys:
+    (database instance id, change counter, row count, max id).
+    """
+    state = dict(conn.execute("SELECT key, value FROM index_state").fetchall())
+    count, max_id = conn.execute(
+        "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM recipies"
+    ).fetchone()
+    return (state.get('instance', 0), state.get('recipes', 0), count, max_id)
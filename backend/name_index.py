@@ -0,0 +1,128 @@
+import heapq
+import threading
+from collections import defaultdict
+
+class RecipeNameIndex:
+    """
+    In-memory infix index over recipe names for typeahead.
+    Every substring of length 1..n of a lowercased name is mapped to the
+    ids of the names containing it (n-gram posting lists). Longer queries
+    intersect the postings of their n-grams and verify the candidates.
+    Results rank prefix matches first, then word-start matches, then
+    other infix matches; ties go to the more popular recipe.
+    """
+
+    def __init__(self, n=3):
+        self.n = n
+        self.names = []          # id -> display name
+        self.lowered = []        # id -> lowercased name
+        self.ids = {}            # lowercased name -> id
+        self.popularity = []     # id -> score (e.g. view count)
+        self.postings = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name.lower() in self.ids
+
+    def _grams(self, text):
+        grams = set()
+        for size in range(1, self.n + 1):
+            for i in range(len(text) - size + 1):
+                grams.add(text[i:i + size])
+        return grams
+
+    def add(self, name, popularity=0):
+        """Index a new recipe name. Returns False if it is already indexed."""
+        lowered = name.lower()
+        with self.lock:
+            if lowered in self.ids:
+                return False
+            rid = len(self.names)
+            self.names.append(name)
+            self.lowered.append(lowered)
+            self.popularity.append(popularity)
+            self.ids[lowered] = rid
+            for gram in self._grams(lowered):
+                self.postings[gram].add(rid)
+        return True
+
+    def get(self, name):
+        """Return the display name stored for `name` (any case), or None."""
+        rid = self.ids.get(name.lower())
+        return None if rid is None else self.names[rid]
+
+    def bump(self, name, amount=1):
+        """Increase a recipe's popularity score (e.g. on a page view)."""
+        rid = self.ids.get(name.lower())
+        if rid is not None:
+            self.popularity[rid] += amount
+
+    def set_popularity(self, name, score):
+        rid = self.ids.get(name.lower())
+        if rid is not None:
+            self.popularity[rid] = score
+
+    def _candidates(self, q):
+        if len(q) <= self.n:
+            return list(self.postings.get(q, ()))
+        lists = sorted(
+            (self.postings.get(q[i:i + self.n], set())
+             for i in range(len(q) - self.n + 1)),
+            key=len
+        )
+        hits = set(lists[0])
+        for other in lists[1:]:
+            hits &= other
+            if not hits:
+                break
+        return [rid for rid in hits if q in self.lowered[rid]]
+
+    def suggest(self, q, limit=10, prefixes=None):
+        """
+        Return up to `limit` display names containing `q`, best first.
+
+        A query no longer than n matches through a single posting list,
+        which for one or two letters holds most names. `prefixes(q, limit)`
+        (e.g. Trie.autocomplete over the same names) then supplies the
+        prefix matches, best first, and the postings are only scanned when
+        it returns fewer than `limit`.
+        """
+        q = q.lower().strip()
+        if not q:
+            return []
+        lowered, popularity = self.lowered, self.popularity
+        first = []
+        if prefixes is not None and len(q) <= self.n:
+            first = [self.ids[word] for word in prefixes(q, limit) if word in self.ids]
+            if len(first) >= limit:
+                return [self.names[rid] for rid in first[:limit]]
+        with self.lock:
+            candidates = self._candidates(q)
+        if first:
+            # every prefix match is already in `first`
+            candidates = [rid for rid in candidates if not lowered[rid].startswith(q)]
+
+        def rank(rid):
+            name = lowered[rid]
+            if name.startswith(q):
+                kind = 0
+            elif f" {q}" in name:
+                kind = 1
+            else:
+                kind = 2
+            return (kind, -popularity[rid], name)
+
+        rest = heapq.nsmallest(limit - len(first), candidates, key=rank)
+        return [self.names[rid] for rid in first + rest]
@@ -0,0 +1,97 @@
+import heapq
+import threading
+from text_tokens import ingredient_terms
+
+class PantryIndex:
+    """
+    "What can I cook" matcher.
+    Every distinct ingredient term (see text_tokens.ingredient_terms) gets a
+    bit position and every recipe is stored as an int bitset of its terms.
+    Matching a pantry is then one AND-NOT plus a popcount per recipe:
+    missing = recipe_bits & ~pantry_bits.
+    """
+
+    def __init__(self):
+        self.vocab = {}        # term -> bit position
+        self.terms = []        # bit position -> term
+        self.names = []        # recipe slot -> name
+        self.masks = []        # recipe slot -> bitset of its terms
+        self.sizes = []        # recipe slot -> number of terms
+        self.slots = {}        # name -> recipe slot
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _bit(self, term):
+        bit = self.vocab.get(term)
+        if bit is None:
+            bit = self.vocab[term] = len(self.terms)
+            self.terms.append(term)
+        return bit
+
+    def add(self, name, ingredients_text):
+        """Index a recipe's ingredient text. Re-adding a name replaces it."""
+        with self.lock:
+            mask = 0
+            for term in ingredient_terms(ingredients_text):
+                mask |= 1 << self._bit(term)
+            slot = self.slots.get(name)
+            if slot is None:
+                self.slots[name] = len(self.names)
+                self.names.append(name)
+                self.masks.append(mask)
+                self.sizes.append(mask.bit_count())
+            else:
+                self.masks[slot] = mask
+                self.sizes[slot] = mask.bit_count()
+
+    def pantry_mask(self, items):
+        """Bitset for a pantry list, plus the terms no recipe uses."""
+        mask, unknown = 0, []
+        for item in items:
+            for term in ingredient_terms(item):
+                bit = self.vocab.get(term)
+                if bit is None:
+                    unknown.append(term)
+                else:
+                    mask |= 1 << bit
+        return mask, sorted(set(unknown))
+
+    def match(self, items, max_missing=1, limit=20):
+        """
+        Recipes missing at most `max_missing` terms, fully makeable first,
+        then by share of the recipe covered by the pantry. Recipes sharing
+        no term with the pantry are never matches.
+        Returns (matches, unknown_terms).
+        """
+        have, unknown = self.pantry_mask(items)
+        lacking = ~have
+        with self.lock:
+            masks, sizes = self.masks, self.sizes
+            counts = [(mask & lacking).bit_count() for mask in masks]
+            hits = heapq.nsmallest(limit, (
+                (missing, missing / sizes[slot], slot)
+                for slot, missing in enumerate(counts)
+                if missing <= max_missing and masks[slot] & have
+            ))
+            out = []
+            for missing, _, slot in hits:
+                mask = masks[slot] & lacking
+                out.append({
+                    "name": self.names[slot],
+                    "missing_count": missing,
+                    "missing": [self.terms[i] for i in range(mask.bit_length())
+                                if mask >> i & 1],
+                    "coverage": round(1 - missing / sizes[slot], 3),
+                })
+        return out, unknown
@@ -1,123 +1,124 @@
+import heapq
+import itertools
+
+_REMOVED = object()   # placeholder for entries removed through their handle
+
 class PriorityQueue:
     """
-    A priority queue implementation using a binary heap.
-    Higher values have higher priority.
+    A priority queue implementation using a binary heap (heapq).
+    Higher values have higher priority. Equal priorities are ordered by
+    `tiebreak(item)` (smaller first) and then by insertion order, so the
+    ordering is stable. insert() returns a handle that can be passed to
+    update() or remove().
     """
-    
-    def __init__(self):
-        self.heap = []
+
+    def __init__(self, items=None, tiebreak=None):
+        self._heap = []
+        self._counter = itertools.count()
+        self.tiebreak = tiebreak
         self.size = 0
-        
-    def parent(self, i):
-        """Return the parent index of i."""
-        return (i - 1) // 2
-        
-    def left_child(self, i):
-        """Return the left child index of i."""
-        return 2 * i + 1
-        
-    def right_child(self, i):
-        """Return the right child index of i."""
-        return 2 * i + 2
-        
-    def has_parent(self, i):
-        """Check if i has a parent."""
-        return self.parent(i) >= 0
-        
-    def has_left_child(self, i):
-        """Check if i has a left child."""
-        return self.left_child(i) < self.size
-        
-    def has_right_child(self, i):
-        """Check if i has a right child."""
-        return self.right_child(i) < self.size
-        
-    def swap(self, i, j):
-        """Swap elements at indices i and j."""
-        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
-        
-    def sift_up(self, i):
-        """Sift up the element at index i to maintain heap property."""
-        while self.has_parent(i) and self.heap[i][0] > self.heap[self.parent(i)][0]:
-            self.swap(i, self.parent(i))
-            i = self.parent(i)
-            
-    def sift_down(self, i):
-        """Sift down the element at index i to maintain heap property."""
-        max_index = i
-        
-        if self.has_left_child(i) and self.heap[self.left_child(i)][0] > self.heap[max_index][0]:
-            max_index = self.left_child(i)
-            
-        if self.has_right_child(i) and self.heap[self.right_child(i)][0] > self.heap[max_index][0]:
-            max_index = self.right_child(i)
-            
-        if i != max_index:
-            self.swap(i, max_index)
-            self.sift_down(max_index)
-            
+        if items is not None:
+            self.extend(items)
+
+    @classmethod
+    def from_items(cls, items, tiebreak=None):
+        """Build a queue from (priority, item) pairs in O(n)."""
+        return cls(items, tiebreak=tiebreak)
+
+    def __len__(self):
+        return self.size
+
+    def _entry(self, priority, item):
+        # heap entries compare as (-priority, tiebreak, seq); seq is unique,
+        # so items themselves are never compared
+        tie = self.tiebreak(item) if self.tiebreak else 0
+        return [-priority, tie, next(self._counter), item]
+
     def insert(self, priority, item):
-        """Insert an item with the given priority."""
-        self.heap.append((priority, item))
+        """Insert an item with the given priority and return its handle."""
+        entry = self._entry(priority, item)
+        heapq.heappush(self._heap, entry)
         self.size += 1
-        self.sift_up(self.size - 1)
-        
+        return entry
+
+    def extend(self, items):
+        """Add many (priority, item) pairs with one O(n) heapify."""
+        before = len(self._heap)
+        self._heap.extend(self._entry(p, item) for p, item in items)
+        self.size += len(self._heap) - before
+        heapq.heapify(self._heap)
+
+    def remove(self, handle):
+        """Remove the entry behind `handle` (lazily). Returns False if already gone."""
+        if handle[3] is _REMOVED:
+            return False
+        handle[3] = _REMOVED
+        self.size -= 1
+        if len(self._heap) > 2 * self.size + 32:
+            # too many tombstones: rebuild from the live entries
+            self._heap = [e for e in self._heap if e[3] is not _REMOVED]
+            heapq.heapify(self._heap)
+        return True
+
+    def update(self, handle, priority):
+        """Change the priority of a queued item. Returns the new handle."""
+        item = handle[3]
+        if item is _REMOVED or not self.remove(handle):
+            raise KeyError("handle is not in the queue")
+        return self.insert(priority, item)
+
+    def _prune(self):
+        heap = self._heap
+        while heap and heap[0][3] is _REMOVED:
+            heapq.heappop(heap)
+
     def extract_max(self):
-        """Extract and return the item with the highest priority."""
-        if self.size == 0:
+        """Extract and return the (priority, item) with the highest priority."""
+        self._prune()
+        if not self._heap:
             return None
-            
-        result = self.heap[0]
-        
-        self.heap[0] = self.heap[self.size - 1]
-        self.heap.pop()
+        entry = heapq.heappop(self._heap)
         self.size -= 1
-        
-        if self.size > 0:
-            self.sift_down(0)
-            
-        return result
-        
+        item = entry[3]
+        entry[3] = _REMOVED   # stale handles must not be removed again
+        return (-entry[0], item)
+
     def peek(self):
-        """Return the item with the highest priority without removing it."""
-        if self.size == 0:
+        """Return the (priority, item) with the highest priority without removing it."""
+        self._prune()
+        if not self._heap:
             return None
-        return self.heap[0]
-        
+        entry = self._heap[0]
+        return (-entry[0], entry[3])
+
     def is_empty(self):
         """Check if the priority queue is empty."""
         return self.size == 0
-        
+
+    def nlargest(self, k):
+        """
+        Return the k highest (priority, item) pairs, best first, without
+        modifying or copying the heap. Walks the heap from the root with a
+        small frontier heap, so it costs O(k log k).
+        """
+        heap, result = self._heap, []
+        if k <= 0 or not heap:
+            return result
+        frontier = [(heap[0], 0)]
+        while frontier and len(result) < k:
+            entry, i = heapq.heappop(frontier)
+            if entry[3] is not _REMOVED:
+                result.append((-entry[0], entry[3]))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return result
+
+    @property
+    def heap(self):
+        """The live (priority, item) pairs in heap order."""
+        return [(-e[0], e[3]) for e in self._heap if e[3] is not _REMOVED]
+
     def get_all_sorted(self):
         """Return all items sorted by priority (highest first)."""
-        # Create a copy of the heap to avoid modifying the original
-        temp_heap = self.heap.copy()
-        result = []
-        
-        # Extract all items in order
-        while temp_heap:
-            priority, item = temp_heap[0]
-            result.append(item)
-            
-            temp_heap[0] = temp_heap[-1]
-            temp_heap.pop()
-            
-            i = 0
-            while True:
-                max_index = i
-                left = 2 * i + 1
-                right = 2 * i + 2
-                
-                if left < len(temp_heap) and temp_heap[left][0] > temp_heap[max_index][0]:
-                    max_index = left
-                    
-                if right < len(temp_heap) and temp_heap[right][0] > temp_heap[max_index][0]:
-                    max_index = right
-                    
-                if i == max_index:
-                    break
-                    
-                temp_heap[i], temp_heap[max_index] = temp_heap[max_index], temp_heap[i]
-                i = max_index
-                
-        return result
+        return [e[3] for e in sorted(self._heap) if e[3] is not _REMOVED]
@@ -1,35 +1,38 @@
 from recipe_scrapers import scrape_me
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, url_for
 
 recipe_importer = Blueprint('recipe_importer', __name__)
 
+def import_recipe_url(url):
+    """Scrape one recipe page (runs on a job worker, not the request thread)."""
+    scraper = scrape_me(url)
+
+    # Extract recipe data
+    return {
+        "name": scraper.title(),
+        "ingredients": scraper.ingredients(),
+        "instructions": scraper.instructions_list() if hasattr(scraper, 'instructions_list') else scraper.instructions().split('\n'),
+        "notes": "",  # Add any additional notes here
+    }
+
 @recipe_importer.route('/import-recipe', methods=['POST'])
 def import_recipe():
-    data = request.get_json()
+    """
+    Queue the import and return 202 at once; poll the returned status_url
+    until status is 'done' (the recipe is in 'result') or 'failed'.
+    """
+    data = request.get_json() or {}
     url = data.get('url')
-    
+
     if not url:
         return jsonify({"success": False, "error": "No URL provided"}), 400
-    
-    try:
-        # Scrape the recipe
-        scraper = scrape_me(url)
-        
-        # Extract recipe data
-        recipe = {
-            "name": scraper.title(),
-            "ingredients": scraper.ingredients(),
-            "instructions": scraper.instructions_list() if hasattr(scraper, 'instructions_list') else scraper.instructions().split('\n'),
-            "notes": "",  # Add any additional notes here
-        }
-        
-        # You could add logic here to save to your recipes.json file
-        # or return it to the frontend for user confirmation
-        
-        return jsonify({
-            "success": True, 
-            "recipe": recipe,
-            "message": "Recipe successfully imported! You can now add it to your collection."
-        })
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+
+    # user-facing imports jump ahead of bulk scraping jobs
+    job_id = current_app.extensions['jobs'].submit('import', {'url': url}, priority=10)
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status": "pending",
+        "status_url": url_for('get_job', job_id=job_id),
+        "message": "Import queued. You can add it to your collection once it finishes."
+    }), 202
@@ -1,59 +1,132 @@
-import sqlite3
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from recipe_scrapers import scrape_me
+from recipe_scrapers import scrape_html
+from search_index import RecipeSearchIndex
+from keyword_matcher import KeywordMatcher
+from recipe_store import insert_recipes
+from db import get_pool
+
+class TokenBucket:
+    """Blocking token bucket: `rate` requests per second, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 class RecipeScraper:
     """
     Scrapes recipes and persists them into a SQLite database table 'recipies'.
     Filters for Native American relevance before saving.
+    `on_save`, if given, is called with every recipe that gets inserted
+    (used to keep in-memory search indexes up to date).
+
+    Pages are fetched by up to `max_workers` threads over pooled keep-alive
+    sessions, with at most `per_domain_rate` requests/second per domain,
+    a `timeout` per request and `retries` retries with exponential backoff.
+
+    Relevance keywords come from `keywords_path` (a JSON list or
+    {keyword: weight} object, re-read when it changes) or the built-in list.
     """
 
-    def __init__(self, db_path):
+    USER_AGENT = 'Mozilla/5.0 (compatible; NativeCuisineBot/1.0)'
+
+    def __init__(self, db_path, on_save=None, max_workers=8, per_domain_rate=1.0,
+                 timeout=10, retries=3, backoff=0.5, keywords_path=None,
+                 min_score=0.0):
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path)
-        self.conn.row_factory = sqlite3.Row
-        # Ensure name uniqueness by creating an index
-        self.conn.execute(
-            'CREATE UNIQUE INDEX IF NOT EXISTS idx_recipe_name ON recipies(name)'
+        self.keyword_matcher = (
+            KeywordMatcher.from_file(keywords_path) if keywords_path
+            else KeywordMatcher()
         )
-        self.conn.commit()
+        self.min_score = min_score
+        self.on_save = on_save
+        self.max_workers = max_workers
+        self.per_domain_rate = per_domain_rate
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+        self._local = threading.local()
+        # Connections come from the shared pool (WAL: writes here do not
+        # block the web app's readers)
+        self.pool = get_pool(self.db_path)
+        with self.pool.connection() as conn:
+            # Ensure name uniqueness by creating an index
+            conn.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_recipe_name ON recipies(name)'
+            )
+            conn.commit()
+            # Saved recipes are picked up by the full-text index via triggers
+            RecipeSearchIndex().ensure(conn)
 
     def recipe_exists(self, name):
-        cur = self.conn.execute(
-            'SELECT 1 FROM recipies WHERE name = ?', (name,)
-        )
-        return cur.fetchone() is not None
+        with self.pool.connection() as conn:
+            cur = conn.execute(
+                'SELECT 1 FROM recipies WHERE name = ?', (name,)
+            )
+            return cur.fetchone() is not None
 
     def save_recipe(self, recipe):
         """Insert a recipe into the database if not already present."""
-        if self.recipe_exists(recipe['name']):
-            return False
-        self.conn.execute(
-            'INSERT INTO recipies(name, ingredients, instructions) VALUES (?, ?, ?)',
-            (
-                recipe['name'],
-                '\n'.join(recipe['ingredients']),
-                '\n'.join(recipe['instructions'])
-            )
-        )
-        self.conn.commit()
-        return True
+        return self.save_recipes([recipe])['inserted'] == 1
+
+    def save_recipes(self, recipes, batch_size=500):
+        """
+        Insert many recipes, one transaction per `batch_size` rows.
+        Names already in the table (or repeated in the input) are skipped
+        via the unique idx_recipe_name index.
+        Returns {'inserted': n, 'skipped': m}.
+        """
+        inserted = skipped = 0
+        batch = []
+
+        def write(batch):
+            with self.pool.connection() as conn:
+                added = insert_recipes(conn, batch)
+            if self.on_save:
+                for recipe in added:
+                    self.on_save(recipe)
+            return len(added)
+
+        for recipe in recipes:
+            batch.append(recipe)
+            if len(batch) >= batch_size:
+                count = write(batch)
+                inserted += count
+                skipped += len(batch) - count
+                batch = []
+        if batch:
+            count = write(batch)
+            inserted += count
+            skipped += len(batch) - count
+        return {'inserted': inserted, 'skipped': skipped}
 
     def is_native_american_recipe(self, recipe_data):
-        # (same filtering logic as before)
-        keywords = [
-            'native american', 'indigenous', 'tribal', 'first nations',
-            'wild rice', 'three sisters', 'succotash', 'pemmican', 'wojapi',
-            'bannock', 'fry bread', 'venison', 'elk', 'bison', 'buffalo',
-            'sumac', 'sage', 'cranberry', 'blueberry'
-        ]
-        title = recipe_data.get('name', '').lower()
-        if any(k in title for k in keywords):
-            return True
-        ingredients_text = ' '.join(recipe_data.get('ingredients', [])).lower()
-        return any(k in ingredients_text for k in keywords)
+        self.keyword_matcher.reload_if_changed()
+        return self.keyword_matcher.is_match(recipe_data, self.min_score)
 
     def extract_ingredients_from_soup(self, soup):
         # (unchanged extraction logic)
@@ -63,10 +136,45 @@ class RecipeScraper:
         # (unchanged extraction logic)
         ...
 
+    def session(self):
+        """A keep-alive requests.Session per thread, with retries and backoff."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            retry = Retry(
+                total=self.retries,
+                backoff_factor=self.backoff,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=('GET', 'HEAD'),
+            )
+            adapter = HTTPAdapter(max_retries=retry, pool_maxsize=self.max_workers)
+            session = requests.Session()
+            session.headers['User-Agent'] = self.USER_AGENT
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    def rate_limiter(self, url):
+        """The token bucket shared by every request to url's domain."""
+        domain = urlparse(url).netloc
+        with self._buckets_lock:
+            bucket = self._buckets.get(domain)
+            if bucket is None:
+                bucket = self._buckets[domain] = TokenBucket(self.per_domain_rate)
+        return bucket
+
+    def fetch(self, url):
+        """GET a page (rate-limited per domain) and return its HTML."""
+        self.rate_limiter(url).acquire()
+        resp = self.session().get(url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.text
+
     def scrape_recipe(self, url):
         """Scrape a single recipe, filter, and return it or None."""
+        html = self.fetch(url)
         try:
-            scraper = scrape_me(url, wild_mode=True)
+            scraper = scrape_html(html, org_url=url, wild_mode=True)
             recipe = {
                 'name': scraper.title(),
                 'ingredients': scraper.ingredients(),
@@ -77,9 +185,8 @@ class RecipeScraper:
                 )
             }
         except Exception:
-            # fallback to BeautifulSoup
-            resp = requests.get(url)
-            soup = BeautifulSoup(resp.text, 'html.parser')
+            # fallback to BeautifulSoup on the page we already have
+            soup = BeautifulSoup(html, 'html.parser')
             title_elem = soup.select_one('h1')
             recipe = {
                 'name': title_elem.text.strip() if title_elem else 'Unknown',
@@ -91,12 +198,28 @@ class RecipeScraper:
             return recipe
         return None
 
-    def scrape_recipes_from_urls(self, urls):
-        """Scrape and save multiple URLs into the database."""
+    def iter_scrape(self, urls, errors=None):
+        """
+        Scrape `urls` concurrently, yielding (url, recipe_or_None) as each
+        page finishes. Failed pages yield None and, if `errors` is given,
+        add {url: message} to it.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.scrape_recipe, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    yield url, future.result()
+                except Exception as e:
+                    print(f"Error scraping {url}: {e}")
+                    if errors is not None:
+                        errors[url] = str(e)
+                    yield url, None
+
+    def scrape_recipes_from_urls(self, urls, errors=None):
+        """Scrape multiple URLs concurrently, saving each recipe as it arrives."""
         added = []
-        for url in urls:
-            time.sleep(1)
-            rec = self.scrape_recipe(url)
+        for _, rec in self.iter_scrape(urls, errors):
             if rec and self.save_recipe(rec):
                 added.append(rec)
         return added
@@ -106,10 +229,10 @@ class RecipeScraper:
         links = []
         for url in search_urls:
             # extract links based on domain
+            self.rate_limiter(url).acquire()
             if 'allrecipes.com' in url:
                 links += self.extract_recipe_links_from_allrecipes(url)
             # add other domains...
-            time.sleep(2)
         # include additional hardcoded Native American URLs...
         links = list(dict.fromkeys(links))[:max_recipes]
 
@@ -0,0 +1,166 @@
+# Normalized recipe lines: one row per ingredient / instruction step.
+# The newline-joined blobs in 'recipies' stay the source for full-text
+# search; listings read these tables instead of re-splitting the blobs.
+
+LINE_TABLES = ('recipe_ingredients', 'recipe_instructions')
+
+def create_line_tables(conn):
+    for table in LINE_TABLES:
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {table}(
+                recipe_id INTEGER NOT NULL,
+                position  INTEGER NOT NULL,
+                text      TEXT NOT NULL,
+                PRIMARY KEY(recipe_id, position)
+            ) WITHOUT ROWID;
+            CREATE TRIGGER IF NOT EXISTS {table}_recipe_ad AFTER DELETE ON recipies BEGIN
+                DELETE FROM {table} WHERE recipe_id = old.id;
+            END;
+        """)
+
+def _lines(value):
+    if isinstance(value, str):
+        value = value.split('\n')
+    return list(value)
+
+def write_lines(conn, recipes_by_id):
+    """Store ingredient/instruction rows for {recipe_id: recipe_dict}."""
+    for table, field in zip(LINE_TABLES, ('ingredients', 'instructions')):
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table}(recipe_id, position, text) VALUES (?, ?, ?)",
+            [(rid, pos, text)
+             for rid, recipe in recipes_by_id.items()
+             for pos, text in enumerate(_lines(recipe[field]))]
+        )
+
+def backfill_lines(conn, batch_size=1000):
+    """
+    Normalize recipes that have no line rows yet (rows inserted by plain SQL,
+    e.g. the schema.sql seed). Returns the number of recipes backfilled.
+    """
+    cur = conn.execute(
+        "SELECT id, ingredients, instructions FROM recipies r "
+        "WHERE NOT EXISTS (SELECT 1 FROM recipe_ingredients i WHERE i.recipe_id = r.id) "
+        "AND NOT EXISTS (SELECT 1 FROM recipe_instructions s WHERE s.recipe_id = r.id)"
+    )
+    total = 0
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        with conn:
+            write_lines(conn, {
+                row[0]: {'ingredients': row[1], 'instructions': row[2]} for row in rows
+            })
+        total += len(rows)
+    return total
+
+def insert_recipes(conn, recipes, log_changes=True):
+    """
+    Insert a batch of recipe dicts (name, ingredients, instructions lists)
+    in one transaction, with their normalized line rows. Names that already
+    exist, or repeat within the batch, are skipped.
+    With log_changes=False the per-recipe 'change_log' rows written by the
+    insert trigger are dropped in the same transaction (bulk loads announce
+    a single 'reindex' change instead).
+    Returns the list of recipes actually inserted.
+    """
+    names = list(dict.fromkeys(r['name'] for r in recipes))
+    if not names:
+        return []
+    placeholders = ','.join('?' * len(names))
+    with conn:
+        if not conn.in_transaction:
+            # take the write lock before the check, so no other writer can
+            # add one of these names between the check and the insert
+            conn.execute("BEGIN IMMEDIATE")
+        seen = {
+            row[0] for row in conn.execute(
+                f"SELECT name FROM recipies WHERE name IN ({placeholders})", names
+            )
+        }
+        fresh = []
+        for recipe in recipes:
+            if recipe['name'] not in seen:
+                seen.add(recipe['name'])
+                fresh.append(recipe)
+        if not fresh:
+            return []
+        inserted = conn.executemany(
+            "INSERT OR IGNORE INTO recipies(name, ingredients, instructions) VALUES (?, ?, ?)",
+            [(r['name'], '\n'.join(_lines(r['ingredients'])),
+              '\n'.join(_lines(r['instructions']))) for r in fresh]
+        ).rowcount
+        if not log_changes and inserted > 0:
+            # we hold the write lock: the trigger's rows are the newest ones
+            conn.execute(
+                "DELETE FROM change_log WHERE kind = 'recipe' "
+                "AND id > (SELECT MAX(id) FROM change_log) - ?", (inserted,)
+            )
+        fresh_names = [r['name'] for r in fresh]
+        ids = dict(conn.execute(
+            f"SELECT name, id FROM recipies WHERE name IN ({','.join('?' * len(fresh_names))})",
+            fresh_names
+        ).fetchall())
+        write_lines(conn, {ids[r['name']]: r for r in fresh if r['name'] in ids})
+    return fresh
+
+def fetch_lines(conn, ids):
+    """{recipe_id: (ingredients, instructions)} for the given ids."""
+    ids = list(ids)
+    out = {rid: ([], []) for rid in ids}
+    if not ids:
+        return out
+    placeholders = ','.join('?' * len(ids))
+    for slot, table in enumerate(LINE_TABLES):
+        for rid, text in conn.execute(
+            f"SELECT recipe_id, text FROM {table} "
+            f"WHERE recipe_id IN ({placeholders}) ORDER BY recipe_id, position",
+            ids
+        ):
+            out[rid][slot].append(text)
+    return out
+
+def recipe_dicts(conn, rows):
+    """
+    Turn 'recipies' rows (id, name, ingredients, instructions) into dicts with
+    ingredient/instruction lists, read from the line tables. Falls back to
+    splitting the blob for rows that were never normalized.
+    """
+    lines = fetch_lines(conn, [r[0] for r in rows])
+    out = []
+    for r in rows:
+        ingredients, instructions = lines[r[0]]
+        if not ingredients and not instructions:
+            ingredients, instructions = r[2].split('\n'), r[3].split('\n')
+        out.append({
+            'id': r[0],
+            'name': r[1],
+            'ingredients': ingredients,
+            'instructions': instructions,
+        })
+    return out
+
+def iter_recipe_pages(conn, where='', params=(), after=0, limit=None, page_size=500):
+    """
+    Keyset-paginate 'recipies' by id (id > after), yielding lists of recipe
+    dicts of at most page_size, until `limit` recipes have been produced.
+    Memory stays bounded by page_size regardless of catalog size.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        clause = f"id > ?{' AND ' + where if where else ''}"
+        rows = conn.execute(
+            f"SELECT id, name, ingredients, instructions FROM recipies "
+            f"WHERE {clause} ORDER BY id LIMIT ?",
+            [after, *params, size]
+        ).fetchall()
+        if not rows:
+            return
+        yield recipe_dicts(conn, rows)
+        after = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < size:
+            return
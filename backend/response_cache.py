@@ -0,0 +1,131 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, make_response, request
+
+class ResponseCache:
+    """
+    LRU + TTL cache of serialized responses for read-only Flask routes.
+
+    Entries are keyed by path and normalized query args (sorted, stripped,
+    empty values dropped) and carry tags such as 'recipes' or
+    'reviews:<name>'; invalidate(tag) drops exactly the entries that
+    depend on the changed data. Responses get a content-hash ETag and
+    'Cache-Control: no-cache', so clients revalidate with If-None-Match
+    and receive 304 Not Modified while the data is unchanged.
+
+    Every invalidation bumps a per-tag generation. A view's response is
+    only stored if none of its tags changed while it was being computed,
+    so a body built from data that was invalidated meanwhile is never
+    cached.
+    """
+
+    def __init__(self, maxsize=256, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()   # key -> (response bytes, mimetype, etag, expires, tags)
+        self.tagged = {}               # tag -> set of keys
+        self.generations = {}          # tag -> invalidation count
+        self.epoch = 0                 # bumped by clear()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def request_key():
+        args = sorted(
+            (k, v.strip()) for k, v in request.args.items(multi=True) if v.strip()
+        )
+        return request.path, tuple(args)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[3] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generation(self, tags):
+        """Snapshot of `tags`' generations, to pass to put()."""
+        with self.lock:
+            return self.epoch, tuple(self.generations.get(tag, 0) for tag in tags)
+
+    def put(self, key, body, mimetype, tags=(), ttl=None, generation=None):
+        """
+        Store a response. With `generation` (from generation(tags), taken
+        before the body was computed) the entry is returned but not stored
+        if any of its tags was invalidated since.
+        """
+        tags = tuple(tags)
+        etag = hashlib.sha1(body).hexdigest()
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        entry = (body, mimetype, etag, expires, frozenset(tags))
+        with self.lock:
+            if generation is not None and generation != (
+                self.epoch, tuple(self.generations.get(tag, 0) for tag in tags)
+            ):
+                return entry
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = entry
+            for tag in entry[4]:
+                self.tagged.setdefault(tag, set()).add(key)
+            while len(self.entries) > self.maxsize:
+                self._drop(next(iter(self.entries)))
+        return entry
+
+    def _drop(self, key):
+        entry = self.entries.pop(key)
+        for tag in entry[4]:
+            keys = self.tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tagged[tag]
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of `tags`."""
+        with self.lock:
+            for tag in tags:
+                self.generations[tag] = self.generations.get(tag, 0) + 1
+                for key in list(self.tagged.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.tagged.clear()
+            self.generations.clear()
+            self.epoch += 1
+
+    def cached(self, tags, ttl=None):
+        """
+        Decorator for a view. `tags` is a list of tags or a function of the
+        view's keyword arguments returning one. Only 200 responses are stored.
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                key = self.request_key()
+                entry = self.get(key)
+                if entry is None:
+                    entry_tags = tuple(tags(**kwargs) if callable(tags) else tags)
+                    generation = self.generation(entry_tags)
+                    resp = make_response(view(*args, **kwargs))
+                    if resp.status_code != 200 or resp.is_streamed:
+                        return resp
+                    entry = self.put(key, resp.get_data(), resp.mimetype, entry_tags, ttl,
+                                     generation=generation)
+                body, mimetype, etag, _, _ = entry
+                resp = Response(body, mimetype=mimetype)
+                resp.set_etag(etag)
+                resp.cache_control.no_cache = True
+                return resp.make_conditional(request)
+            return wrapper
+        return decorator
@@ -1,102 +1,370 @@
 # review.py
+import heapq
 import json
 import os
+import sqlite3
+import sys
+import threading
 import time
-from priority_queue import PriorityQueue
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from metrics import timed
+from db import connect
+from changes import create_change_log, log_change
+
+class Review:
+    """One review, stored compactly (no per-instance __dict__)."""
+    __slots__ = ('id', 'username', 'rating', 'comment', 'timestamp')
+
+    def __init__(self, id, username, rating, comment, timestamp):
+        self.id = id
+        self.username = sys.intern(username)     # few users, many reviews
+        self.rating = rating
+        self.comment = comment
+        self.timestamp = timestamp
+
+    def as_dict(self):
+        return {
+            'username': self.username,
+            'rating': self.rating,
+            'comment': self.comment,
+            'timestamp': self.timestamp
+        }
 
 class ReviewManager:
     """
-    Manages recipe reviews using a priority queue,
-    persisted in a JSON file.
+    Manages recipe reviews, persisted in a SQLite 'reviews' table.
+    Each new review is a single INSERT (an O(1) durable append); the legacy
+    JSON file is imported once when the table is empty and can still be
+    written as an export with save_reviews().
+
+    Only aggregates live in memory for every recipe: per-recipe rating
+    sums and counts (one GROUP BY at startup, then kept up to date on every
+    review) and a sorted top-rated index. Recipes are ranked by a
+    weighted average (prior_mean counted prior_weight times, i.e. a
+    Bayesian average; plain average when prior_weight is 0) and only
+    recipes with at least min_reviews reviews are ranked.
+
+    Review bodies are loaded per recipe on first access, as compact Review
+    records, and kept in an LRU of `cache_size` recipes.
     """
 
-    def __init__(self, reviews_file_path):
-        # take the path to your JSON storage
+    def __init__(self, reviews_file_path, db_path=None,
+                 min_reviews=1, prior_mean=3.0, prior_weight=0, cache_size=1024):
+        # take the path to your JSON storage (import source / export target)
         self.reviews_file_path = reviews_file_path
-        self.reviews = self.load_reviews()
-        self.review_queues = {}
-        self.initialize_queues()
+        self.db_path = db_path or os.path.splitext(reviews_file_path)[0] + '.db'
+        self.lock = threading.Lock()
+        self.conn = connect(self.db_path)
+        self.conn.executescript(
+            """CREATE TABLE IF NOT EXISTS reviews(
+                   id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                   recipe_name TEXT NOT NULL,
+                   username    TEXT NOT NULL,
+                   rating      REAL NOT NULL,
+                   comment     TEXT NOT NULL DEFAULT '',
+                   timestamp   REAL NOT NULL
+               );
+               CREATE INDEX IF NOT EXISTS idx_reviews_recipe
+                   ON reviews(recipe_name, id);"""
+        )
+        create_change_log(self.conn)
+        self.import_json()
+        self.min_reviews = min_reviews
+        self.prior_mean = prior_mean
+        self.prior_weight = prior_weight
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # recipe -> [Review] in id order, LRU
+        self.hits = self.misses = 0
+        self.rating_sums = {}
+        self.rating_counts = {}
+        self.scores = {}          # recipe -> ranking score (if ranked)
+        self.top_rated = []       # sorted (score, recipe), best last
+        self.loaded_id = 0        # highest review id in the aggregates
+        self.initialize_aggregates()
 
-    def load_reviews(self):
-        """Load reviews from the JSON file (or return empty dict)."""
+    def import_json(self):
+        """Copy reviews from the JSON file into an empty reviews table."""
+        if self.conn.execute('SELECT 1 FROM reviews LIMIT 1').fetchone():
+            return 0
         try:
-            if os.path.exists(self.reviews_file_path):
-                with open(self.reviews_file_path, 'r') as f:
-                    return json.load(f)
-            return {}
+            if not os.path.exists(self.reviews_file_path):
+                return 0
+            with open(self.reviews_file_path, 'r') as f:
+                data = json.load(f)
         except Exception as e:
+            print(f"Error importing reviews: {e}")
+            return 0
+        rows = [
+            (name, rev['username'], rev['rating'],
+             rev.get('comment', ''), rev.get('timestamp', 0))
+            for name, revs in data.items() for rev in revs
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO reviews(recipe_name, username, rating, comment, timestamp) '
+                'VALUES (?, ?, ?, ?, ?)', rows
+            )
+        return len(rows)
+
+    @timed("review_manager.load_reviews")
+    def load_reviews(self, recipe_name):
+        """Read one recipe's reviews from the database, oldest first."""
+        try:
+            rows = self.conn.execute(
+                'SELECT id, username, rating, comment, timestamp '
+                'FROM reviews WHERE recipe_name = ? ORDER BY id', (recipe_name,)
+            ).fetchall()
+        except sqlite3.Error as e:
             print(f"Error loading reviews: {e}")
-            return {}
+            return []
+        return [Review(*row) for row in rows]
 
+    @timed("review_manager.load_reviews_batch")
+    def load_reviews_batch(self, recipe_names):
+        """{recipe_name: [Review] oldest first} for many recipes, one query per 500 names."""
+        loaded = {name: [] for name in recipe_names}
+        names = list(loaded)
+        try:
+            for start in range(0, len(names), 500):      # under SQLite's 999 parameters
+                chunk = names[start:start + 500]
+                rows = self.conn.execute(
+                    'SELECT recipe_name, id, username, rating, comment, timestamp '
+                    f'FROM reviews WHERE recipe_name IN ({",".join("?" * len(chunk))}) '
+                    'ORDER BY recipe_name, id', chunk
+                ).fetchall()
+                for row in rows:
+                    loaded[row[0]].append(Review(*row[1:]))
+        except sqlite3.Error as e:
+            print(f"Error loading reviews: {e}")
+        return loaded
+
+    def _cache(self, recipe_name, reviews):
+        self.cache[recipe_name] = reviews
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def _reviews(self, recipe_name):
+        """The cached review list for a recipe, loading it on a miss (hold the lock)."""
+        reviews = self.cache.get(recipe_name)
+        if reviews is not None:
+            self.hits += 1
+            self.cache.move_to_end(recipe_name)
+            return reviews
+        self.misses += 1
+        reviews = self.load_reviews(recipe_name) if self.rating_counts.get(recipe_name) else []
+        self._cache(recipe_name, reviews)
+        return reviews
+
+    @timed("review_manager.save_reviews")
     def save_reviews(self):
-        """Write the in-memory reviews back to JSON."""
+        """
+        Export every review to the JSON file.
+        Writes to a temp file and renames it, so a crash never leaves
+        a half-written file behind. Not needed for durability.
+        """
+        # per-process temp file: concurrent exports never write into each other
+        tmp_path = f"{self.reviews_file_path}.{os.getpid()}.tmp"
         try:
-            with open(self.reviews_file_path, 'w') as f:
-                json.dump(self.reviews, f, indent=2)
+            with open(tmp_path, 'w') as f:
+                # streamed from the table, one recipe at a time
+                f.write('{')
+                current = None
+                for row in self.conn.execute(
+                    'SELECT recipe_name, username, rating, comment, timestamp '
+                    'FROM reviews ORDER BY recipe_name, id'
+                ):
+                    if row['recipe_name'] != current:
+                        f.write('\n  ' if current is None else '\n  ],\n  ')
+                        f.write(json.dumps(row['recipe_name']) + ': [\n    ')
+                        current = row['recipe_name']
+                    else:
+                        f.write(',\n    ')
+                    f.write(json.dumps({key: row[key] for key in
+                                        ('username', 'rating', 'comment', 'timestamp')}))
+                f.write('\n}\n' if current is None else '\n  ]\n}\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.reviews_file_path)
             return True
         except Exception as e:
             print(f"Error saving reviews: {e}")
             return False
 
-    def initialize_queues(self):
-        """Build a PriorityQueue of past reviews per recipe."""
-        for recipe_name, reviews in self.reviews.items():
-            pq = PriorityQueue()
-            for rev in reviews:
-                pq.insert(rev['rating'], rev)
-            self.review_queues[recipe_name] = pq
+    @timed("review_manager.initialize_aggregates")
+    def initialize_aggregates(self):
+        """Load rating sums/counts with one GROUP BY and build the top-rated index."""
+        self.loaded_id = self.conn.execute(
+            'SELECT COALESCE(MAX(id), 0) FROM reviews'
+        ).fetchone()[0]
+        for name, total, count in self.conn.execute(
+            'SELECT recipe_name, SUM(rating), COUNT(*) FROM reviews '
+            'WHERE id <= ? GROUP BY recipe_name', (self.loaded_id,)
+        ):
+            self.rating_sums[name] = total
+            self.rating_counts[name] = count
+            if count >= self.min_reviews:
+                self.scores[name] = self._score(name)
+        self.top_rated = sorted(
+            (score, name) for name, score in self.scores.items()
+        )
+
+    def _score(self, recipe_name):
+        total = self.rating_sums[recipe_name] + self.prior_mean * self.prior_weight
+        return total / (self.rating_counts[recipe_name] + self.prior_weight)
+
+    def _record_rating(self, recipe_name, rating):
+        """Fold one new rating into the aggregates and re-rank the recipe."""
+        self.rating_sums[recipe_name] = self.rating_sums.get(recipe_name, 0) + rating
+        self.rating_counts[recipe_name] = self.rating_counts.get(recipe_name, 0) + 1
+        old = self.scores.pop(recipe_name, None)
+        if old is not None:
+            del self.top_rated[bisect_left(self.top_rated, (old, recipe_name))]
+        if self.rating_counts[recipe_name] >= self.min_reviews:
+            score = self._score(recipe_name)
+            self.scores[recipe_name] = score
+            insort(self.top_rated, (score, recipe_name))
 
+    @timed("review_manager.add_review")
     def add_review(self, recipe_name, username, rating, comment):
-        """Add a new review, queue it, persist it, and return it."""
-        review = {
-            'username': username,
-            'rating': rating,
-            'comment': comment,
-            'timestamp': time.time()
-        }
+        """Add a new review, persist it, and return it."""
+        timestamp = time.time()
+        with self.lock:
+            # persist (one appended row, committed before we acknowledge);
+            # other worker processes pick it up from the change log
+            with self.conn:
+                review_id = self.conn.execute(
+                    'INSERT INTO reviews(recipe_name, username, rating, comment, timestamp) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (recipe_name, username, rating, comment, timestamp)
+                ).lastrowid
+                review = Review(review_id, username, rating, comment, timestamp)
+                log_change(self.conn, 'review',
+                           dict(review.as_dict(), id=review_id, recipe_name=recipe_name))
+            self._apply(recipe_name, review)
+        return review.as_dict()
 
-        # add to dict
-        self.reviews.setdefault(recipe_name, []).append(review)
-        # add to PQ
-        if recipe_name not in self.review_queues:
-            self.review_queues[recipe_name] = PriorityQueue()
-        self.review_queues[recipe_name].insert(rating, review)
-        # persist
-        self.save_reviews()
-        return review
+    def _apply(self, recipe_name, review):
+        # cached lists are extended in place; others load it on next access
+        cached = self.cache.get(recipe_name)
+        if cached is not None and review.id not in (r.id for r in reversed(cached)):
+            # ids from different processes can arrive out of order
+            cached.insert(bisect_left(cached, review.id, key=lambda r: r.id), review)
+        # update running aggregates
+        self._record_rating(recipe_name, review.rating)
+
+    def apply_remote_review(self, payload):
+        """Fold in a review another process wrote (from the change feed)."""
+        # reviews already counted by initialize_aggregates are skipped
+        if payload.get('id', 0) <= self.loaded_id:
+            return False
+        review = Review(payload['id'], payload['username'], payload['rating'],
+                        payload['comment'], payload['timestamp'])
+        with self.lock:
+            self._apply(payload['recipe_name'], review)
+        return True
+
+    def reconnect(self):
+        """Open a fresh connection (in a worker process after fork())."""
+        self.conn = connect(self.db_path)
 
     def get_top_reviews(self, recipe_name, limit=5):
-        """Return the top-N reviews (by rating) for a recipe."""
-        if recipe_name not in self.review_queues:
-            return []
-        # clone the queue so we don't destroy it
-        clone = PriorityQueue()
-        for prio, item in self.review_queues[recipe_name].heap:
-            clone.insert(prio, item)
-        top = []
-        for _ in range(min(limit, clone.size)):
-            top.append(clone.extract_max()[1])
-        return top
+        """Return the top-N reviews (by rating, newest first on ties) for a recipe."""
+        with self.lock:
+            reviews = self._reviews(recipe_name)
+            best = heapq.nlargest(limit, reviews, key=lambda r: (r.rating, r.timestamp))
+        return [r.as_dict() for r in best]
 
     def get_all_reviews(self, recipe_name):
         """Return every review for a recipe in insertion order."""
-        return self.reviews.get(recipe_name, [])
+        with self.lock:
+            reviews = self._reviews(recipe_name)
+            return [r.as_dict() for r in reviews]
 
     def get_average_rating(self, recipe_name):
-        """Compute the float average rating, or 0 if none."""
-        revs = self.reviews.get(recipe_name, [])
-        if not revs:
+        """Return the float average rating, or 0 if none (O(1))."""
+        count = self.rating_counts.get(recipe_name)
+        if not count:
             return 0
-        return sum(r['rating'] for r in revs) / len(revs)
+        return self.rating_sums[recipe_name] / count
+
+    def get_reviews_batch(self, recipe_names):
+        """
+        {recipe_name: {'reviews': [...], 'average_rating': avg}} for many
+        recipes. Uncached recipes with reviews are read in one query.
+        """
+        found = {}
+        with self.lock:
+            for name in recipe_names:
+                reviews = self.cache.get(name)
+                if reviews is not None:
+                    self.hits += 1
+                    self.cache.move_to_end(name)
+                    found[name] = reviews
+            missing = [name for name in dict.fromkeys(recipe_names) if name not in found]
+            self.misses += len(missing)
+            loaded = self.load_reviews_batch(
+                [name for name in missing if self.rating_counts.get(name)])
+            for name in missing:
+                found[name] = loaded.get(name, [])
+                self._cache(name, found[name])
+            return {
+                name: {'reviews': [r.as_dict() for r in found[name]],
+                       'average_rating': self.get_average_rating(name)}
+                for name in recipe_names
+            }
+
+    def get_average_ratings(self, recipe_names):
+        """{recipe_name: average rating (0 if unrated)} for many recipes."""
+        return {name: self.get_average_rating(name) for name in recipe_names}
 
     def get_top_rated_recipes(self, limit=10):
         """
         Return a list of (recipe_name, avg_rating) sorted
-        descending by rating, limited to `limit`.
+        descending by ranking score, limited to `limit` (O(limit)).
         """
-        ratings = [
-            (self.get_average_rating(name), name)
-            for name in self.reviews
-        ]
-        ratings.sort(reverse=True)
-        return [(name, avg) for avg, name in ratings[:limit]]
+        if limit <= 0:
+            return []
+        with self.lock:
+            best = self.top_rated[-limit:]
+        return [(name, self.get_average_rating(name))
+                for _, name in reversed(best)]
+
+    def memory_footprint(self):
+        """
+        Measured size (bytes) of what is held in memory: cached Review
+        records with their comments, each interned username once, and the
+        per-recipe aggregates.
+        """
+        # copy under the lock, measure without it: add_review() extends
+        # cached lists in place and would otherwise wait out the whole walk
+        with self.lock:
+            cached = [(name, sys.getsizeof(reviews), list(reviews))
+                      for name, reviews in self.cache.items()]
+            hits, misses = self.hits, self.misses
+            aggregates = sum(
+                sys.getsizeof(d) for d in (self.rating_sums, self.rating_counts,
+                                           self.scores, self.top_rated)
+            )
+            names = list(self.rating_counts)
+        aggregates += sum(sys.getsizeof(name) for name in names)
+        records = comments = reviews = 0
+        usernames = {}
+        for name, list_size, cached_reviews in cached:
+            records += list_size + sys.getsizeof(name)
+            for r in cached_reviews:
+                records += sys.getsizeof(r)
+                comments += sys.getsizeof(r.comment)
+                usernames[id(r.username)] = sys.getsizeof(r.username)
+            reviews += len(cached_reviews)
+        return {
+            'cached_recipes': len(cached),
+            'cached_reviews': reviews,
+            'cache_hits': hits,
+            'cache_misses': misses,
+            'records_bytes': records,
+            'comments_bytes': comments,
+            'usernames_bytes': sum(usernames.values()),
+            'aggregates_bytes': aggregates,
+            'total_bytes': records + comments + sum(usernames.values()) + aggregates,
+        }
@@ -1,7 +1,7 @@
 /* ─── additional Native American recipes (frybread-free) ─── */
 
 /* 1 ▸ Three Sisters Stew */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Three Sisters Stew',
 '1 Tbsp sunflower oil,
 1 small onion, diced,
@@ -21,7 +21,7 @@ Simmer 15 min till squash is tender; season and serve.'
 );
 
 /* 2 ▸ Wojapi (Berry Sauce) */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Wojapi (Native American Berry Sauce)',
 '3 C. chokecherries or blueberries,
 ½ C. water,
@@ -32,7 +32,7 @@ Sweeten if desired; serve warm over cornbread or ice-cream.'
 );
 
 /* 3 ▸ Wild Rice & Cranberry Salad */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Wild Rice & Cranberry Salad',
 '2 C. cooked wild rice,
 1/3 C. dried cranberries,
@@ -48,7 +48,7 @@ Chill 30 min; serve.'
 );
 
 /* 4 ▸ Bison & Juniper Meatballs */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Bison & Juniper Meatballs',
 '1 lb ground bison,
 1 egg,
@@ -62,7 +62,7 @@ Pan-fry in hot oil 8–10 min until 160 °F inside.'
 );
 
 /* 5 ▸ Three Sisters Succotash */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Three Sisters Succotash',
 '1 Tbsp sunflower oil,
 1 C. diced zucchini,
@@ -79,7 +79,7 @@ Season and serve.'
 );
 
 /* 6 ▸ Cedar-Plank Maple Salmon */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Cedar-Plank Maple Salmon',
 '1 lb salmon fillet,
 ¼ C. maple syrup,
@@ -92,7 +92,7 @@ Place on soaked plank; grill covered 12–15 min until fish flakes.'
 );
 
 /* 7 ▸ Acorn Soup */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Acorn Soup',
 '2 C. leached acorn meal,
 4 C. water,
@@ -104,7 +104,7 @@ Salt to taste; serve hot.'
 );
 
 /* 8 ▸ Cherokee Bean Bread */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Cherokee Bean Bread',
 '2 C. mashed pinto beans,
 3 C. masa harina,
@@ -118,7 +118,7 @@ Steam 45 min until set; slice warm.'
 );
 
 /* 9 ▸ Hopi Piki Bread */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Hopi Piki Bread',
 '1 C. blue cornmeal,
 ¼ tsp culinary ash,
@@ -129,7 +129,7 @@ Cook seconds; lift and roll sheets while warm.'
 );
 
 /*10 ▸ Native-Style Salmon Bake */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Native-Style Salmon Bake',
 '1 lb salmon,
 1 Tbsp sea salt,
@@ -140,7 +140,7 @@ Bake on cedar plank over camp-fire 15-20 min.'
 );
 
 /*11 ▸ Pumpkin & Corn Dessert */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Pumpkin & Corn Dessert',
 '2 C. pumpkin cubes,
 1 C. fresh corn,
@@ -154,7 +154,7 @@ Serve warm or chilled.'
 );
 
 /*12 ▸ Bison Stew with Three Sisters */
-INSERT INTO recipies(name,ingredients,instructions) VALUES(
+INSERT OR IGNORE INTO recipies(name,ingredients,instructions) VALUES(
 'Bison Stew with Three Sisters',
 '1 lb bison cubes,
 1 Tbsp sunflower oil,
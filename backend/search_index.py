@@ -0,0 +1,102 @@
+import re
+import sqlite3
+
+class RecipeSearchIndex:
+    """
+    Full-text search over the 'recipies' table using SQLite FTS5.
+    The index is an external-content table kept in sync by triggers,
+    so every insert (scraper, schema loader, manual SQL) is indexed.
+    Results are ranked with BM25, weighting name > ingredients > instructions.
+    """
+
+    TABLE = 'recipies_fts'
+    COLUMNS = ('name', 'ingredients', 'instructions')
+
+    def __init__(self, weights=(10.0, 4.0, 1.0)):
+        self.weights = weights
+        self.available = False
+
+    def ensure(self, conn):
+        """
+        Create the FTS table and sync triggers if missing.
+        Returns False when this SQLite build has no FTS5 support.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+            (self.TABLE,)
+        ).fetchone() is not None
+        try:
+            conn.executescript(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {self.TABLE} USING fts5(
+                    name, ingredients, instructions,
+                    content='recipies', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2',
+                    prefix='2 3'
+                );
+                CREATE TRIGGER IF NOT EXISTS recipies_fts_ai AFTER INSERT ON recipies BEGIN
+                    INSERT INTO {self.TABLE}(rowid, name, ingredients, instructions)
+                    VALUES (new.id, new.name, new.ingredients, new.instructions);
+                END;
+                CREATE TRIGGER IF NOT EXISTS recipies_fts_ad AFTER DELETE ON recipies BEGIN
+                    INSERT INTO {self.TABLE}({self.TABLE}, rowid, name, ingredients, instructions)
+                    VALUES ('delete', old.id, old.name, old.ingredients, old.instructions);
+                END;
+                CREATE TRIGGER IF NOT EXISTS recipies_fts_au AFTER UPDATE ON recipies BEGIN
+                    INSERT INTO {self.TABLE}({self.TABLE}, rowid, name, ingredients, instructions)
+                    VALUES ('delete', old.id, old.name, old.ingredients, old.instructions);
+                    INSERT INTO {self.TABLE}(rowid, name, ingredients, instructions)
+                    VALUES (new.id, new.name, new.ingredients, new.instructions);
+                END;
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable: {e}")
+            self.available = False
+            return False
+        if not exists:
+            # index rows that were inserted before the triggers existed
+            self.rebuild(conn)
+        self.available = True
+        return True
+
+    def rebuild(self, conn):
+        """Re-index every row of 'recipies' from scratch."""
+        conn.execute(f"INSERT INTO {self.TABLE}({self.TABLE}) VALUES ('rebuild')")
+        conn.commit()
+
+    @staticmethod
+    def _terms(text):
+        """Split user text into quoted FTS5 prefix terms ('"bis"*')."""
+        return [f'"{tok}"*' for tok in re.findall(r"\w+", text.lower())]
+
+    def match_query(self, text='', name='', ingredient=''):
+        """
+        Build an FTS5 MATCH expression. `text` searches all columns,
+        `name` and `ingredient` are restricted to their own column.
+        Every token is a prefix term and all terms must match.
+        Returns '' when there is nothing to search for.
+        """
+        parts = []
+        for column, value in (
+            ('{name ingredients instructions}', text),
+            ('name', name),
+            ('ingredients', ingredient),
+        ):
+            terms = self._terms(value)
+            if terms:
+                parts.append(f"{column} : ({' AND '.join(terms)})")
+        return ' AND '.join(parts)
+
+    def search(self, conn, match, limit=None):
+        """Return matching recipe rows, best BM25 score first."""
+        weights = ', '.join(str(w) for w in self.weights)
+        sql = (
+            f"SELECT r.id, r.name, r.ingredients, r.instructions "
+            f"FROM {self.TABLE} JOIN recipies r ON r.id = {self.TABLE}.rowid "
+            f"WHERE {self.TABLE} MATCH ? "
+            f"ORDER BY bm25({self.TABLE}, {weights})"
+        )
+        params = [match]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return conn.execute(sql, params).fetchall()
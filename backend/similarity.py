@@ -0,0 +1,182 @@
+import threading
+import numpy as np
+from scipy import sparse
+from text_tokens import ingredient_terms
+
+class SimilarityIndex:
+    """
+    "Similar recipes" from ingredient overlap.
+
+    Each recipe is a sparse binary vector of its ingredient terms (see
+    text_tokens.ingredient_terms) weighted by IDF and L2-normalized, so a
+    dot product is the cosine similarity. build() computes every recipe's
+    top-k neighbours with batched sparse matrix products (batch_size rows
+    at a time, so only a batch_size x n block of scores exists at once).
+
+    Recipes added after build() are folded in incrementally: the new row
+    gets its own neighbours and enters the lists of existing recipes it
+    beats. IDF weights are refreshed by a full rebuild once the catalog
+    has grown by `rebuild_ratio` since the last build.
+
+    Terms found in more than `max_df` of all recipes (salt, water, ...)
+    get weight 0: they say little about similarity and would otherwise
+    make the score matrix nearly dense.
+    """
+
+    def __init__(self, k=10, batch_size=256, rebuild_ratio=0.1, max_df=0.25):
+        self.k = k
+        self.max_df = max_df
+        self.batch_size = batch_size
+        self.rebuild_ratio = rebuild_ratio
+        self.vocab = {}        # term -> column
+        self.names = []        # row -> name
+        self.rows = {}         # name -> row
+        self.docs = []         # row -> column ids
+        self.matrix = None     # CSR, n x len(vocab), rows L2-normalized
+        self.idf = None
+        self.neighbors = np.zeros((0, k), dtype=np.int32)
+        self.scores = np.zeros((0, k), dtype=np.float32)
+        self.built_size = 0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.rows
+
+    def _columns(self, ingredients_text):
+        cols = []
+        for term in sorted(ingredient_terms(ingredients_text)):
+            col = self.vocab.get(term)
+            if col is None:
+                col = self.vocab[term] = len(self.vocab)
+            cols.append(col)
+        return cols
+
+    def _weighted(self, docs, idf):
+        """L2-normalized IDF-weighted CSR rows for `docs`."""
+        indptr = np.zeros(len(docs) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(cols) for cols in docs])
+        indices = np.fromiter((c for cols in docs for c in cols),
+                              dtype=np.int32, count=int(indptr[-1]))
+        data = idf[indices].astype(np.float32)
+        matrix = sparse.csr_matrix((data, indices, indptr),
+                                   shape=(len(docs), len(idf)))
+        matrix.eliminate_zeros()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags((1.0 / norms).astype(np.float32)) @ matrix
+
+    def _top_k(self, block, exclude=None):
+        """
+        Best k entries of each row of a sparse (CSR) score block, best
+        first and padded with -1. Only stored (non-zero) scores are ranked,
+        so the cost follows the block's nnz, not its width.
+        """
+        rows = block.shape[0]
+        ids = np.full((rows, self.k), -1, dtype=np.int32)
+        scores = np.full((rows, self.k), -1.0, dtype=np.float32)
+        data, indices, indptr = block.data, block.indices, block.indptr
+        for r in range(rows):
+            cols = indices[indptr[r]:indptr[r + 1]]
+            vals = data[indptr[r]:indptr[r + 1]]
+            if exclude is not None:
+                keep = cols != exclude[r]
+                cols, vals = cols[keep], vals[keep]
+            if len(vals) > self.k:
+                best = np.argpartition(vals, len(vals) - self.k)[-self.k:]
+                cols, vals = cols[best], vals[best]
+            order = np.argsort(-vals, kind='stable')
+            ids[r, :len(order)] = cols[order]
+            scores[r, :len(order)] = vals[order]
+        return ids, scores
+
+    def add(self, name, ingredients_text):
+        """Index a recipe; after build() this updates neighbours incrementally."""
+        with self.lock:
+            if name in self.rows:
+                return False
+            row = len(self.names)
+            self.rows[name] = row
+            self.names.append(name)
+            self.docs.append(self._columns(ingredients_text))
+            if self.matrix is None:
+                return True
+            self._add_row(row)
+            stale = row + 1 - self.built_size > self.rebuild_ratio * max(self.built_size, 1)
+        if stale:
+            self.build()
+        return True
+
+    def _add_row(self, row):
+        # new terms get the rarest weight; columns grow to the new vocabulary
+        idf = np.full(len(self.vocab), self.idf.max(initial=1.0),
+                      dtype=np.float32)
+        idf[:len(self.idf)] = self.idf
+        self.idf = idf
+        vector = self._weighted([self.docs[row]], idf)
+        matrix = self.matrix
+        matrix.resize((matrix.shape[0], len(idf)))
+        sims = (vector @ matrix.T).tocsr()
+
+        # the new recipe's own neighbours
+        ids, scores = self._top_k(sims)
+
+        # existing recipes for which it beats the current k-th neighbour
+        beats = sims.data > np.maximum(self.scores[sims.indices, -1], 0)
+        for other, score in zip(sims.indices[beats], sims.data[beats]):
+            pos = int(np.searchsorted(-self.scores[other], -score, side='right'))
+            self.neighbors[other] = np.insert(self.neighbors[other], pos, row)[:self.k]
+            self.scores[other] = np.insert(self.scores[other], pos, score)[:self.k]
+
+        self.matrix = sparse.vstack([matrix, vector], format='csr')
+        self.neighbors = np.vstack([self.neighbors, ids])
+        self.scores = np.vstack([self.scores, scores])
+
+    def build(self):
+        """(Re)compute IDF weights and every recipe's neighbours."""
+        with self.lock:
+            docs = list(self.docs)
+            n = len(docs)
+            df = np.bincount(np.fromiter((c for cols in docs for c in cols), dtype=np.int64),
+                             minlength=len(self.vocab))
+        idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+        if n >= 20:         # too few recipes to call any term common
+            idf[df > self.max_df * n] = 0.0
+        matrix = self._weighted(docs, idf)
+        transposed = matrix.T.tocsr()
+        neighbors = np.full((n, self.k), -1, dtype=np.int32)
+        scores = np.full((n, self.k), -1.0, dtype=np.float32)
+        for start in range(0, n, self.batch_size):
+            stop = min(start + self.batch_size, n)
+            block = (matrix[start:stop] @ transposed).tocsr()
+            ids, best = self._top_k(block, exclude=np.arange(start, stop))
+            neighbors[start:stop] = ids
+            scores[start:stop] = best
+        with self.lock:
+            # fold in recipes added while the matrices were being built
+            self.matrix, self.idf = matrix, idf
+            self.neighbors, self.scores = neighbors, scores
+            self.built_size = n
+            for row in range(n, len(self.docs)):
+                self._add_row(row)
+
+    def similar(self, name, limit=10):
+        """[(name, score)] of the most similar recipes, best first."""
+        with self.lock:
+            row = self.rows.get(name)
+            if row is None or row >= len(self.neighbors):
+                return []
+            return [(self.names[other], float(score))
+                    for other, score in zip(self.neighbors[row], self.scores[row])
+                    if other >= 0 and score > 0][:limit]
@@ -0,0 +1,55 @@
+import json
+import mmap
+import os
+import pickle
+
+class IndexSnapshot:
+    """
+    On-disk snapshot of derived in-memory indexes (tries, name index, ...).
+
+    File layout: one JSON header line {"format": F, "key": [...]} followed
+    by a pickle of the index objects. The header is checked before the
+    payload is touched, and the payload is unpickled straight from a
+    memory map. A snapshot is only used when both the format version and
+    the key (the database's recipe change counter) match.
+    """
+
+    FORMAT = 3      # bump whenever the set or shape of stored indexes changes
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, key):
+        """Return the stored indexes for `key`, or None if missing or stale."""
+        try:
+            with open(self.path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get('format') != self.FORMAT or header.get('key') != list(key):
+                    return None
+                offset = f.tell()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm)[offset:] as payload:
+                        return pickle.loads(payload)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable index snapshot: {e}")
+            return None
+
+    def save(self, key, indexes):
+        """Atomically write `indexes` (a dict of picklable objects) for `key`."""
+        # per-process temp file: workers rebuilding at once never share one
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps({'format': self.FORMAT, 'key': list(key)}).encode() + b'\n')
+                pickle.dump(indexes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"Error saving index snapshot: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
@@ -0,0 +1,167 @@
+"""
+RecipeScraper against a local http.server fixture.
+
+    cd backend && python -m unittest discover tests
+
+Serves recipe detail pages (schema.org JSON-LD, as the real sites publish)
+from a temp directory, plus paths that answer 404, 503 once, or too
+slowly, and checks what gets parsed, filtered, saved and reported.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from db import connect
+from migrations import apply_migrations
+from recipe_scraper import RecipeScraper
+
+RECIPES = {
+    'wojapi': ('Wojapi Berry Sauce',
+               ['2 cups blueberry', '1 cup chokecherries', '1/4 cup honey'],
+               ['Simmer the berries.', 'Mash and sweeten with honey.']),
+    'bannock': ('Traditional Bannock',
+                ['3 cups flour', '1 tbsp baking powder', '1 1/2 cups water'],
+                ['Mix the dough.', 'Fry until golden.']),
+    'lasagna': ('Classic Lasagna',
+                ['12 lasagna noodles', '1 lb ground beef', '2 cups ricotta'],
+                ['Layer everything.', 'Bake for 45 minutes.']),
+}
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>{name}</title>
+<script type="application/ld+json">{ld}</script>
+</head><body><h1>{name}</h1></body></html>
+"""
+
+def recipe_page(name, ingredients, instructions):
+    ld = {
+        '@context': 'https://schema.org',
+        '@type': 'Recipe',
+        'name': name,
+        'recipeIngredient': ingredients,
+        'recipeInstructions': [{'@type': 'HowToStep', 'text': step}
+                               for step in instructions],
+    }
+    return PAGE.format(name=name, ld=json.dumps(ld))
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """Static files, plus /slow (sleeps past the timeout) and /flaky (503 once)."""
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(self.server.slow_seconds)
+            self.path = '/recipes/wojapi.html'
+        elif self.path == '/flaky':
+            with self.server.lock:
+                self.server.flaky_hits += 1
+                first = self.server.flaky_hits == 1
+            if first:
+                self.send_error(503)
+                return
+            self.path = '/recipes/bannock.html'
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+class RecipeScraperFixtureTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(cls.root, 'recipes'))
+        for slug, recipe in RECIPES.items():
+            with open(os.path.join(cls.root, 'recipes', f'{slug}.html'), 'w') as f:
+                f.write(recipe_page(*recipe))
+        cls.server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), partial(FixtureHandler, directory=cls.root))
+        cls.server.daemon_threads = True
+        cls.server.slow_seconds = 2
+        cls.server.lock = threading.Lock()
+        cls.server.flaky_hits = 0
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.root)
+
+    def setUp(self):
+        self.server.flaky_hits = 0
+        self.db_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.db_dir, 'recipes.db')
+        conn = connect(self.db_path)
+        apply_migrations(conn, os.path.join(BACKEND_DIR, 'schema.sql'))
+        conn.close()
+        self.seeded = self.stored_names()      # the schema's sample recipes
+        self.saved = []
+        self.scraper = RecipeScraper(self.db_path, on_save=self.saved.append,
+                                     max_workers=4, per_domain_rate=50,
+                                     timeout=0.5, retries=1, backoff=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.db_dir)
+
+    def url(self, path):
+        return self.base + path
+
+    def stored_names(self):
+        conn = connect(self.db_path)
+        try:
+            return {row[0] for row in conn.execute('SELECT name FROM recipies')}
+        finally:
+            conn.close()
+
+    def test_parses_detail_page(self):
+        recipe = self.scraper.scrape_recipe(self.url('/recipes/wojapi.html'))
+        name, ingredients, instructions = RECIPES['wojapi']
+        self.assertEqual(recipe['name'], name)
+        self.assertEqual(recipe['ingredients'], ingredients)
+        self.assertEqual(recipe['instructions'], instructions)
+
+    def test_filters_unrelated_recipe(self):
+        self.assertIsNone(self.scraper.scrape_recipe(self.url('/recipes/lasagna.html')))
+
+    def test_saves_matches_and_reports_failures(self):
+        urls = [self.url(path) for path in (
+            '/recipes/wojapi.html', '/recipes/bannock.html', '/recipes/lasagna.html',
+            '/recipes/missing.html', '/slow',
+        )]
+        errors = {}
+        added = self.scraper.scrape_recipes_from_urls(urls, errors)
+
+        expected = {RECIPES['wojapi'][0], RECIPES['bannock'][0]}
+        self.assertEqual({r['name'] for r in added}, expected)
+        self.assertEqual({r['name'] for r in self.saved}, expected)
+        self.assertEqual(self.stored_names() - self.seeded, expected)
+        self.assertEqual(set(errors), {self.url('/recipes/missing.html'), self.url('/slow')})
+        self.assertIn('404', errors[self.url('/recipes/missing.html')])
+
+    def test_rescrape_skips_existing(self):
+        url = self.url('/recipes/wojapi.html')
+        self.assertEqual(len(self.scraper.scrape_recipes_from_urls([url])), 1)
+        self.assertEqual(self.scraper.scrape_recipes_from_urls([url]), [])
+        self.assertEqual(len(self.saved), 1)
+
+    def test_retries_server_error(self):
+        errors = {}
+        added = self.scraper.scrape_recipes_from_urls([self.url('/flaky')], errors)
+        self.assertEqual([r['name'] for r in added], [RECIPES['bannock'][0]])
+        self.assertEqual(errors, {})
+        self.assertEqual(self.server.flaky_hits, 2)
+
+if __name__ == '__main__':
+    unittest.main()
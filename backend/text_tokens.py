@@ -0,0 +1,42 @@
+import re
+
+# Shared ingredient tokenization: the ingredient trie, the pantry matcher
+# and the similarity index all see the same vocabulary.
+
+TOKEN_RE = re.compile(r"[A-Za-z]+")
+
+# Quantities, units and preparation words that are not ingredients.
+STOPWORDS = frozenset("""
+    a an and or of to for with without in into on the as at by from per
+    c cup cups tbsp tsp tablespoon tablespoons teaspoon teaspoons oz ounce
+    ounces lb lbs pound pounds g kg ml l qt quart quarts pt pint pints gal
+    can cans pkg package packages jar jars bunch bunches clove cloves pinch
+    dash handful piece pieces slice slices stick sticks inch inches quick
+    small medium large whole half fresh dried fine finely coarse coarsely
+    chopped diced minced sliced cubed crushed ground shredded grated mashed
+    cooked uncooked washed fully toasted soaked leached warm hot cold room
+    temperature optional needed taste as desired more less about cut into
+    plus extra divided packed softened melted beaten peeled seeded rinsed
+    drained sifted strips style fat free low sodium reduced
+""".split())
+
+def ingredient_tokens(text):
+    """Lowercased alphabetic tokens, exactly as fed into the ingredient trie."""
+    return [tok.lower() for tok in TOKEN_RE.findall(text)]
+
+def stem(token):
+    """Cheap plural folding: berries -> berry, tomatoes -> tomato, beans -> bean."""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 4 and token.endswith('oes'):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+def ingredient_terms(text):
+    """Distinct stemmed ingredient terms with units and prep words removed."""
+    return {
+        stem(tok) for tok in ingredient_tokens(text)
+        if len(tok) > 1 and tok not in STOPWORDS
+    }
@@ -0,0 +1,110 @@
+import threading
+import time
+from bisect import bisect_left, insort
+
+HOUR = 3600
+
+# window name -> half-life in seconds (None = all-time, no decay)
+WINDOWS = {
+    'hour': HOUR,
+    'day': 24 * HOUR,
+    'week': 7 * 24 * HOUR,
+    'all': None,
+}
+
+class DecayedRanking:
+    """
+    Exponentially decayed view scores kept in sorted order.
+    Scores are stored relative to a reference time t0 (a view at time t
+    adds 2 ** ((t - t0) / half_life)), so the passage of time never
+    changes the order and only the recipe that was viewed moves.
+    """
+
+    # rebase before 2 ** exponent gets anywhere near float overflow
+    MAX_EXPONENT = 512
+
+    def __init__(self, half_life=None, t0=None):
+        self.half_life = half_life
+        self.t0 = time.time() if t0 is None else t0
+        self.scores = {}
+        self.ordered = []        # sorted (score, name), best last
+
+    def _weight(self, t):
+        if self.half_life is None:
+            return 1.0
+        exponent = (t - self.t0) / self.half_life
+        if exponent > self.MAX_EXPONENT:
+            self._rebase(t)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rebase(self, t):
+        factor = 2.0 ** (-(t - self.t0) / self.half_life)
+        self.t0 = t
+        self.scores = {name: s * factor for name, s in self.scores.items()}
+        self.ordered = [(s * factor, name) for s, name in self.ordered]
+
+    def add(self, name, count=1, t=None):
+        t = time.time() if t is None else t
+        weight = count * self._weight(t)
+        old = self.scores.get(name)
+        if old is not None:
+            del self.ordered[bisect_left(self.ordered, (old, name))]
+        score = (old or 0.0) + weight
+        self.scores[name] = score
+        insort(self.ordered, (score, name))
+
+    def top(self, limit, now=None):
+        """The `limit` best (name, current_score) pairs, best first."""
+        if limit <= 0:
+            return []
+        now = time.time() if now is None else now
+        scale = 1.0 if self.half_life is None else 2.0 ** (-(now - self.t0) / self.half_life)
+        return [(name, score * scale)
+                for score, name in reversed(self.ordered[-limit:])]
+
+class TrendingIndex:
+    """
+    In-memory trending rankings, one DecayedRanking per window in WINDOWS,
+    updated on every recorded view so /trending is served in O(limit).
+    Bootstraps from 'recipe_views' (all-time) and the hourly
+    'recipe_view_buckets' table written by ViewCounterBuffer.
+    """
+
+    def __init__(self, windows=WINDOWS):
+        now = time.time()
+        self.rankings = {name: DecayedRanking(half_life, t0=now)
+                         for name, half_life in windows.items()}
+        self.totals = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, count=1, t=None):
+        t = time.time() if t is None else t
+        with self.lock:
+            self.totals[name] = self.totals.get(name, 0) + count
+            for ranking in self.rankings.values():
+                ranking.add(name, count, t)
+
+    def load(self, conn, horizon_days=28):
+        """Rebuild every ranking from the database."""
+        now = time.time()
+        since = int(now // HOUR) - horizon_days * 24
+        with self.lock:
+            for row in conn.execute("SELECT name, views FROM recipe_views"):
+                self.totals[row[0]] = row[1]
+                self.rankings['all'].add(row[0], row[1])
+            buckets = conn.execute(
+                "SELECT name, hour, views FROM recipe_view_buckets WHERE hour >= ?",
+                (since,)
+            ).fetchall()
+            for name, hour, views in buckets:
+                t = min(hour * HOUR + HOUR / 2, now)
+                for window, ranking in self.rankings.items():
+                    if window != 'all':
+                        ranking.add(name, views, t)
+
+    def top(self, window, limit=10):
+        """[(name, score, total_views)] for `window`, best first."""
+        with self.lock:
+            ranked = self.rankings[window].top(limit)
+            return [(name, score, self.totals.get(name, 0)) for name, score in ranked]
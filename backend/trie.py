@@ -1,50 +1,245 @@
-import sqlite3
+import heapq
+import threading
+from bisect import insort
+from db import get_pool
 
 class Node:
-    def __init__(self, end_of_word=False):
-        self.end_of_word = end_of_word
+    """
+    A radix-trie node. `label` is the (possibly multi-character) edge
+    leading into this node, `count` is how often the word ending here was
+    inserted (0 = not a word) and `top` caches the best completions of the
+    whole subtree as (-count, word) tuples, best first.
+    """
+    __slots__ = ('label', 'children', 'count', 'top')
+
+    def __init__(self, label=''):
+        self.label = label
         self.children = {}
+        self.count = 0
+        self.top = []
 
 class Trie:
     """
-    A simple trie for autocompleting recipe names or ingredients.
+    A compressed (radix) trie for autocompleting recipe names or ingredients.
+    Every word keeps an insertion frequency and every node caches its
+    top-k completions, so autocomplete(prefix, limit<=top_k) costs
+    O(len(prefix) + limit) no matter how large the subtree is.
     Can be populated from any iterable of strings, including a SQLite database.
+    Safe to share between threads: inserts and lookups take the same lock,
+    so no reader sees an edge split half done.
     """
-    def __init__(self):
+    def __init__(self, top_k: int = 10):
         self.root = Node()
+        self.top_k = top_k
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, word):
+        return self.search(word)
+
+    def insert(self, word: str, weight: int = 1) -> None:
+        """Add `word`, or bump its frequency by `weight` if already present."""
+        with self.lock:
+            self._insert(word.lower(), weight)
+
+    def _insert(self, word: str, weight: int) -> None:
+        node, path, i = self.root, [self.root], 0
+        while i < len(word):
+            child = node.children.get(word[i])
+            if child is None:
+                child = Node(word[i:])
+                node.children[word[i]] = child
+                path.append(child)
+                node = child
+                break
+            label = child.label
+            common = 0
+            limit = min(len(label), len(word) - i)
+            while common < limit and label[common] == word[i + common]:
+                common += 1
+            if common < len(label):
+                # split the edge: the new middle node owns the same subtree
+                middle = Node(label[:common])
+                middle.top = list(child.top)
+                child.label = label[common:]
+                middle.children[child.label[0]] = child
+                node.children[word[i]] = middle
+                child = middle
+            path.append(child)
+            node = child
+            i += common
 
-    def insert(self, word: str) -> None:
-        current = self.root
-        for ch in word.lower():
-            if ch not in current.children:
-                current.children[ch] = Node()
-            current = current.children[ch]
-        current.end_of_word = True
+        old = (-node.count, word) if node.count else None
+        if not node.count:
+            self.size += 1
+        node.count += weight
+        new = (-node.count, word)
+        for n in path:
+            self._promote(n, old, new)
+
+    def _promote(self, node: Node, old, new) -> None:
+        """Update a node's cached top-k after one word's count grew."""
+        top = node.top
+        if old is not None and old in top:
+            top.remove(old)
+        elif len(top) >= self.top_k and new >= top[-1]:
+            return
+        insort(top, new)
+        if len(top) > self.top_k:
+            top.pop()
+
+    def _find(self, text: str):
+        """
+        Return (node, node_string) for the subtree holding every word that
+        starts with `text`, or (None, None) if there is none.
+        """
+        node, i = self.root, 0
+        while i < len(text):
+            child = node.children.get(text[i])
+            if child is None:
+                return None, None
+            label = child.label
+            rest = text[i:]
+            if rest.startswith(label):
+                i += len(label)
+                node = child
+            elif label.startswith(rest):
+                return child, text[:i] + label
+            else:
+                return None, None
+        return node, text
 
     def search(self, word: str) -> bool:
-        current = self.root
-        for ch in word.lower():
-            if ch not in current.children:
-                return False
-            current = current.children[ch]
-        return current.end_of_word
-
-    def _collect(self, node: Node, prefix: str, results: list):
-        if node.end_of_word:
-            results.append(prefix)
-        for ch, child in node.children.items():
-            self._collect(child, prefix + ch, results)
-
-    def autocomplete(self, prefix: str) -> list:
-        node = self.root
-        for ch in prefix.lower():
-            if ch not in node.children:
-                return []
-            node = node.children[ch]
-        results = []
-        self._collect(node, prefix, results)
+        return self.frequency(word) > 0
+
+    def frequency(self, word: str) -> int:
+        """How many times `word` was inserted (0 if never)."""
+        with self.lock:
+            return self._frequency(word.lower())
+
+    def _frequency(self, word: str) -> int:
+        node, found = self._find(word)
+        if node is None or found != word:
+            return 0
+        return node.count
+
+    def _collect(self, node: Node, prefix: str) -> list:
+        """Every (-count, word) in a subtree, walked iteratively."""
+        results, stack = [], [(node, prefix)]
+        while stack:
+            node, text = stack.pop()
+            if node.count:
+                results.append((-node.count, text))
+            for child in node.children.values():
+                stack.append((child, text + child.label))
         return results
 
+    def autocomplete(self, prefix: str, limit: int = None) -> list:
+        """
+        Words starting with `prefix`, most frequent first (ties alphabetical).
+        With limit <= top_k the answer comes straight from the node cache.
+        """
+        with self.lock:
+            node, text = self._find(prefix.lower())
+            if node is None:
+                return []
+            if limit is not None and limit <= self.top_k:
+                return [word for _, word in node.top[:limit]]
+            ranked = sorted(self._collect(node, text))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [word for _, word in ranked]
+
+    def raise_frequency(self, word: str, count: int) -> None:
+        """Bring an existing word's frequency up to `count` (never lowers it)."""
+        word = word.lower()
+        with self.lock:
+            current = self._frequency(word)
+            if current and count > current:
+                self._insert(word, count - current)
+
+    @staticmethod
+    def default_distance(prefix: str) -> int:
+        """Edit budget for a query: none for 1-2 chars, 1 up to 5, then 2."""
+        return 0 if len(prefix) <= 2 else 1 if len(prefix) <= 5 else 2
+
+    def fuzzy_search(self, prefix: str, max_distance: int = None, limit: int = 10,
+                     node_budget: int = 2000) -> list:
+        """
+        Words with a prefix within `max_distance` edits (Levenshtein) of
+        `prefix`, as (word, distance) ranked by distance, then frequency.
+
+        Walks the trie best-first, carrying one DP row per edge character
+        and pruning subtrees whose row minimum exceeds the bound. Once the
+        query is fully matched under a node, its cached top-k supplies the
+        completions. At most `node_budget` characters are expanded, so the
+        worst case is bounded even for short, ambiguous queries; results
+        found before the budget runs out are returned.
+        """
+        query = prefix.lower()
+        if max_distance is None:
+            max_distance = self.default_distance(query)
+        limit = min(limit, self.top_k)
+        first = list(range(len(query) + 1))
+        found = {}                      # word -> (distance, -count)
+        heap = [(0, 0, self.root, '', first, first[-1])]
+        with self.lock:
+            self._fuzzy_walk(query, max_distance, limit, node_budget, heap, found)
+        ranked = sorted(found.items(), key=lambda kv: (kv[1], kv[0]))
+        return [(word, distance) for word, (distance, _) in ranked[:limit]]
+
+    def _fuzzy_walk(self, query, max_distance, limit, node_budget, heap, found):
+        seq = 0
+
+        def add(words, distance):
+            for neg_count, word in words:
+                if word not in found or found[word][0] > distance:
+                    found[word] = (distance, neg_count)
+
+        def kth():
+            if len(found) < limit:
+                return None
+            return heapq.nsmallest(limit, found.values())[-1][0]
+
+        while heap and node_budget > 0:
+            bound, _, node, text, row, best = heapq.heappop(heap)
+            cutoff = kth()
+            if cutoff is not None and bound > cutoff:
+                break
+            for child in node.children.values():
+                r, b, t = row, best, text
+                for ch in child.label:
+                    node_budget -= 1
+                    nxt = [r[0] + 1]
+                    for j, qc in enumerate(query, 1):
+                        nxt.append(min(nxt[j - 1] + 1, r[j] + 1, r[j - 1] + (qc != ch)))
+                    r, t = nxt, t + ch
+                    b = min(b, r[-1])
+                    low = min(r)
+                    if low > max_distance or low >= b:
+                        break
+                else:
+                    if child.count and b <= max_distance:
+                        add([(-child.count, t)], b)
+                    seq += 1
+                    heapq.heappush(heap, (low, seq, child, t, r, b))
+                    continue
+                # no descendant gets closer than b: take the cached best
+                if b <= max_distance:
+                    add(child.top, b)
+
     @classmethod
     def from_database(cls, db_path: str, column: str = 'name') -> 'Trie':
         """
@@ -52,18 +247,16 @@ class Trie:
         Specify column='name' for recipe names or 'ingredients' for ingredients list.
         """
         trie = cls()
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cur = conn.execute(f"SELECT {column} FROM recipies;")
-        for row in cur.fetchall():
-            text = row[column] or ''
-            if column == 'ingredients':
-                # split multiple ingredients by newline
-                for ing in text.split('\n'):
-                    if ing.strip():
-                        trie.insert(ing)
-            else:
-                if text.strip():
-                    trie.insert(text)
-        conn.close()
+        with get_pool(db_path).connection() as conn:
+            cur = conn.execute(f"SELECT {column} FROM recipies;")
+            for row in cur:
+                text = row[column] or ''
+                if column == 'ingredients':
+                    # split multiple ingredients by newline
+                    for ing in text.split('\n'):
+                        if ing.strip():
+                            trie.insert(ing)
+                else:
+                    if text.strip():
+                        trie.insert(text)
         return trie
@@ -0,0 +1,144 @@
+import atexit
+import sqlite3
+import threading
+import time
+from collections import Counter
+from db import connect
+from changes import log_change
+
+class ViewCounterBuffer:
+    """
+    Write-behind buffer for the 'recipe_views' counters and the hourly
+    'recipe_view_buckets' used for trending. Increments are aggregated in memory and written in a single
+    executemany transaction once `max_pending` views are buffered,
+    every `flush_interval` seconds, and at interpreter exit.
+
+    Loss bound: a hard crash loses at most `max_pending` views and at most
+    `flush_interval` seconds of views. max_pending=0 writes through on
+    every increment (the old behaviour).
+    """
+
+    def __init__(self, db_path, max_pending=100, flush_interval=5.0, on_flush=None):
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.pending = Counter()
+        self.pending_total = 0
+        self.flushed_total = 0
+        self.last_flush = None
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.conn = None
+        self._thread = None
+        self._stop = threading.Event()
+        atexit.register(self.close)
+
+    def _connection(self):
+        if self.conn is None:
+            self.conn = connect(self.db_path)
+        return self.conn
+
+    def _ensure_thread(self):
+        """Start the periodic flusher on first use."""
+        if self.flush_interval and (self._thread is None or not self._thread.is_alive()):
+            self._thread = threading.Thread(
+                target=self._run, name="view-counter-flush", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            if self.pending_total:
+                try:
+                    self.flush()
+                except sqlite3.Error as e:
+                    print(f"Error flushing view counters: {e}")
+
+    def increment(self, name, count=1, t=None):
+        """Buffer `count` views of `name`, flushing if the buffer is full."""
+        hour = int((time.time() if t is None else t) // 3600)
+        with self.lock:
+            self.pending[(name, hour)] += count
+            self.pending_total += count
+            full = self.pending_total >= self.max_pending
+        if full:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def increment_many(self, counts, t=None):
+        """
+        Buffer {name: views} in one step; a resulting flush writes the whole
+        batch in a single transaction.
+        """
+        hour = int((time.time() if t is None else t) // 3600)
+        with self.lock:
+            for name, count in counts.items():
+                self.pending[(name, hour)] += count
+                self.pending_total += count
+            full = self.pending_total >= self.max_pending
+        if full:
+            self.flush()
+        else:
+            self._ensure_thread()
+
+    def pending_counts(self):
+        """Snapshot of views buffered but not yet written."""
+        counts = Counter()
+        with self.lock:
+            for (name, _), views in self.pending.items():
+                counts[name] += views
+        return dict(counts)
+
+    def flush(self):
+        """Write all buffered increments in one transaction. Returns rows written."""
+        with self.write_lock:
+            with self.lock:
+                batch, self.pending = self.pending, Counter()
+                total, self.pending_total = self.pending_total, 0
+            if not batch:
+                return 0
+            totals = Counter()
+            for (name, _), views in batch.items():
+                totals[name] += views
+            conn = self._connection()
+            try:
+                with conn:
+                    conn.executemany(
+                        """INSERT INTO recipe_views(name, views) VALUES(?, ?)
+                           ON CONFLICT(name) DO UPDATE SET views = views + excluded.views""",
+                        list(totals.items())
+                    )
+                    conn.executemany(
+                        """INSERT INTO recipe_view_buckets(name, hour, views) VALUES(?, ?, ?)
+                           ON CONFLICT(name, hour) DO UPDATE SET views = views + excluded.views""",
+                        [(name, hour, views) for (name, hour), views in batch.items()]
+                    )
+                    log_change(conn, 'views', {'t': time.time(), 'counts': totals})
+            except sqlite3.Error:
+                # keep the increments so the next flush retries them
+                with self.lock:
+                    self.pending.update(batch)
+                    self.pending_total += total
+                raise
+            self.flushed_total += total
+            self.last_flush = time.time()
+        if self.on_flush:
+            self.on_flush(totals)
+        return len(totals)
+
+    def release_connection(self):
+        """Close the writer connection; it is reopened on the next flush."""
+        with self.write_lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def close(self):
+        """Stop the flusher thread and write whatever is still buffered."""
+        self._stop.set()
+        try:
+            self.flush()
+        except sqlite3.Error as e:
+            print(f"Error flushing view counters: {e}")
@@ -1,5 +1,6 @@
 import React, { useState } from "react";
 import axios from "axios";
+import { waitForJob } from "./jobs";
 import "./RecipeScraper.css";
 
 function RecipeImporter() {
@@ -14,10 +15,12 @@ function RecipeImporter() {
     setError(null);
     try {
       const res = await axios.post("/import-recipe", { url });
-      if (res.data.success) setImportedRecipe(res.data.recipe);
+      if (res.data.success) setImportedRecipe(await waitForJob(res.data.status_url));
       else                  setError(res.data.error || "Failed to import recipe");
-    } catch {
-      setError("Error connecting to server. Please try again.");
+    } catch (err) {
+      setError(err.response || !err.message
+        ? "Error connecting to server. Please try again."
+        : err.message);
     } finally {
       setLoading(false);
     }
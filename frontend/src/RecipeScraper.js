@@ -1,5 +1,6 @@
 import React, { useState } from "react";
 import axios from "axios";
+import { waitForJob } from "./jobs";
 import "./RecipeScraper.css";
 
 function RecipeScraper() {
@@ -82,14 +83,20 @@ function RecipeScraper() {
         });
       }
 
-      if (response.data.success) {
-        setResult(response.data);
-      } else {
+      if (!response.data.success) {
         setError(response.data.error || "Failed to scrape recipes");
+        return;
       }
+      // scrapes are queued as jobs: wait for {added: [names], errors: {url: msg}}
+      const job = response.data.status_url
+        ? await waitForJob(response.data.status_url)
+        : response.data;
+      setResult({ added: job.added || [], errors: job.errors || {} });
     } catch (err) {
-      console.error("Error connecting to server:", err);
-      setError("Error connecting to server. Please try again.");
+      console.error("Error scraping recipes:", err);
+      setError(err.response || !err.message
+        ? "Error connecting to server. Please try again."
+        : err.message);
     } finally {
       setLoading(false);
     }
@@ -178,14 +185,30 @@ function RecipeScraper() {
       {result && (
         <div className="result-message">
           <h3>Scraping Complete!</h3>
-          <p>{result.message}</p>
+          <p>
+            Added {result.added.length} new recipe
+            {result.added.length === 1 ? "" : "s"}.
+          </p>
 
-          {result.new_recipes.length > 0 && (
+          {result.added.length > 0 && (
             <div className="new-recipes">
               <h4>Newly Added Recipes:</h4>
               <ul>
-                {result.new_recipes.map((r, idx) => (
-                  <li key={idx}>{r.name}</li>
+                {result.added.map((name, idx) => (
+                  <li key={idx}>{name}</li>
+                ))}
+              </ul>
+            </div>
+          )}
+
+          {Object.keys(result.errors).length > 0 && (
+            <div className="error-message">
+              <h4>Could not scrape:</h4>
+              <ul>
+                {Object.entries(result.errors).map(([url, message]) => (
+                  <li key={url}>
+                    {url}: {message}
+                  </li>
                 ))}
               </ul>
             </div>
@@ -0,0 +1,18 @@
+import axios from "axios";
+
+const POLL_INTERVAL_MS = 1000;
+const POLL_ATTEMPTS    = 60;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Imports and scrapes run as background jobs: poll the job's status_url
+// until it is done (resolves with job.result) or failed (rejects).
+export async function waitForJob(statusUrl, attempts = POLL_ATTEMPTS) {
+  for (let i = 0; i < attempts; i++) {
+    const { data } = await axios.get(statusUrl);
+    if (data.job.status === "done")   return data.job.result;
+    if (data.job.status === "failed") throw new Error(data.job.error || "Job failed");
+    await sleep(POLL_INTERVAL_MS);
+  }
+  throw new Error("This is taking too long. Please check back later.");
+}